@@ -51,6 +51,7 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "medialibrary.utils.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -59,6 +60,30 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+COMPRESSION_MIN_LENGTH = env.int("DJANGO_COMPRESSION_MIN_LENGTH", default=1024)
+COMPRESSION_GZIP_LEVEL = env.int("DJANGO_COMPRESSION_GZIP_LEVEL", default=6)
+COMPRESSION_BROTLI_QUALITY = env.int("DJANGO_COMPRESSION_BROTLI_QUALITY", default=4)
+
+REFERENCE_CACHE_CHECK_INTERVAL = env.int(
+    "DJANGO_REFERENCE_CACHE_CHECK_INTERVAL", default=5
+)
+
+CATALOG_READ_MODEL = env.bool("DJANGO_CATALOG_READ_MODEL", default=False)
+
+VIDEO_UPLOAD_MAX_SIZE = env.int(
+    "DJANGO_VIDEO_UPLOAD_MAX_SIZE", default=5 * 1024 * 1024 * 1024
+)
+VIDEO_UPLOAD_EXPIRATION_HOURS = env.int(
+    "DJANGO_VIDEO_UPLOAD_EXPIRATION_HOURS", default=24
+)
+PHOTO_UPLOAD_MAX_SIZE = env.int(
+    "DJANGO_PHOTO_UPLOAD_MAX_SIZE", default=20 * 1024 * 1024
+)
+DIRECT_UPLOAD_EXPIRATION = env.int("DJANGO_DIRECT_UPLOAD_EXPIRATION", default=3600)
+# Per transcoding job, the queue's worker concurrency caps the number of jobs.
+VIDEO_TRANSCODE_THREADS = env.int("DJANGO_VIDEO_TRANSCODE_THREADS", default=2)
+VIDEO_TRANSCODE_PRESET = env("DJANGO_VIDEO_TRANSCODE_PRESET", default="veryfast")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -108,6 +133,15 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "medialibrary.utils.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "medialibrary.utils.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.TokenAuthentication",
     ),
@@ -148,7 +182,12 @@ STATICFILES_DIRS = (os.path.join(ROOT_DIR, "static"),)
 MEDIA_ROOT = os.path.join(ROOT_DIR, "media")
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+STORAGES = {
+    "default": {"BACKEND": "storages.backends.s3.S3Storage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
 AWS_STORAGE_BUCKET_NAME = env("AWS_BUCKET_NAME", default="")
 AWS_ACCESS_KEY_ID = env("AWS_ACCESS_KEY_ID", default="")
 AWS_SECRET_ACCESS_KEY = env("AWS_SECRET_ACCESS_KEY", default="")
@@ -156,6 +195,8 @@ AWS_DEFAULT_ACL = "public-read"
 AWS_QUERYSTRING_AUTH = False
 AWS_S3_FILE_OVERWRITE = False
 AWS_S3_REGION_NAME = "eu-central-1"
+# Downloads larger than this are spooled to disk instead of memory.
+AWS_S3_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 
 AWS_S3_OBJECT_PARAMETERS = {
     "CacheControl": "public, max-age=31536000, immutable",
@@ -163,12 +204,21 @@ AWS_S3_OBJECT_PARAMETERS = {
 
 CELERY_BROKER_URL = "redis://redis:6379"
 CELERY_RESULT_BACKEND = "redis://redis:6379"
+# Transcoding saturates CPUs for minutes, so it runs on its own workers
+# (see the celery_transcoding service) instead of delaying other tasks.
+CELERY_TASK_ROUTES = {
+    "medialibrary.common.tasks.transcode_video_hls": {"queue": "transcoding"},
+}
 
 CELERY_BEAT_SCHEDULE = {
     "fetch_movies": {
         "task": "medialibrary.catalog.tasks.fetch_movies",
         "schedule": crontab(hour=9, minute=0),
     },
+    "delete_expired_video_uploads": {
+        "task": "medialibrary.common.tasks.delete_expired_video_uploads",
+        "schedule": crontab(minute=30),
+    },
 }
 
 EMAIL_BACKEND = env(
@@ -19,5 +19,5 @@ DEBUG_TOOLBAR_CONFIG = {
 }
 
 if AWS_STORAGE_BUCKET_NAME == "":
-    DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    STORAGES["default"] = {"BACKEND": "django.core.files.storage.FileSystemStorage"}
     FILE_UPLOAD_PERMISSIONS = 0o644
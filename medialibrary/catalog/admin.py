@@ -24,12 +24,11 @@ class StaffRoleAdmin(admin.ModelAdmin):
 @admin.register(catalog_m.Staff)
 class StaffAdmin(admin.ModelAdmin):
     list_display = ["person", "movie", "series", "role"]
+    list_select_related = ["person", "movie", "series", "role"]
+    list_filter = ["role"]
+    raw_id_fields = ["person", "movie", "series"]
     readonly_fields = ["created_at", "updated_at"]
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.prefetch_related("role", "movie")
-
 
 @admin.register(catalog_m.Movie)
 class MovieAdmin(admin.ModelAdmin):
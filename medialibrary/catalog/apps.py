@@ -1,6 +1,89 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 
 
 class CatalogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "medialibrary.catalog"
+
+    def ready(self):
+        import medialibrary.catalog.cache as catalog_cache
+        import medialibrary.catalog.documents as catalog_d
+        import medialibrary.catalog.models as catalog_m
+        import medialibrary.common.models as common_m
+        import medialibrary.utils.drf as utils_drf
+
+        for reference_cache in catalog_cache.REFERENCE_CACHES:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    reference_cache.invalidate,
+                    sender=reference_cache.get_model(),
+                    dispatch_uid=reference_cache.version_key,
+                )
+        # Genre names and posters are rendered inside cached media. Saved
+        # photos only invalidate them once their file or variants change, from
+        # `Photo.save()` and `generate_photo_variants`.
+        for model, signal in (
+            (catalog_m.MediaGenre, post_save),
+            (catalog_m.MediaGenre, post_delete),
+            (common_m.Photo, post_delete),
+        ):
+            signal.connect(
+                utils_drf.invalidate_representations,
+                sender=model,
+                dispatch_uid="invalidate_representations",
+            )
+        post_delete.connect(
+            catalog_m.drop_deleted_genre_ids,
+            sender=catalog_m.MediaGenre,
+            dispatch_uid="drop_deleted_genre_ids",
+        )
+        for model in (catalog_m.Movie, catalog_m.Series, catalog_m.Game):
+            m2m_changed.connect(
+                catalog_m.sync_genre_ids,
+                sender=model.genres.through,
+                dispatch_uid=f"sync_genre_ids_{model._meta.model_name}",
+            )
+
+        for model in catalog_d.DOCUMENTS:
+            post_save.connect(
+                catalog_d.media_saved,
+                sender=model,
+                dispatch_uid=f"refresh_document_{model._meta.model_name}",
+            )
+            m2m_changed.connect(
+                catalog_d.media_genres_changed,
+                sender=model.genres.through,
+                dispatch_uid=f"refresh_document_genres_{model._meta.model_name}",
+            )
+        for rating_model in catalog_d.RATINGS:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    catalog_d.rating_changed,
+                    sender=rating_model,
+                    dispatch_uid=f"refresh_document_{rating_model._meta.model_name}",
+                )
+        post_save.connect(
+            catalog_d.media_genre_changed,
+            sender=catalog_m.MediaGenre,
+            dispatch_uid="refresh_documents_media_genre",
+        )
+        # Before the delete, while `genre_ids` still finds the items holding
+        # the genre. Their refresh runs on commit.
+        pre_delete.connect(
+            catalog_d.media_genre_changed,
+            sender=catalog_m.MediaGenre,
+            dispatch_uid="refresh_documents_deleted_media_genre",
+        )
+        post_save.connect(
+            catalog_d.poster_changed,
+            sender=common_m.Photo,
+            dispatch_uid="refresh_documents_poster",
+        )
+        # Deleting a poster nulls `poster` with an UPDATE that sends no
+        # signals, so the items are looked up before the delete.
+        pre_delete.connect(
+            catalog_d.poster_changed,
+            sender=common_m.Photo,
+            dispatch_uid="refresh_documents_deleted_poster",
+        )
@@ -0,0 +1,7 @@
+from medialibrary.utils.cache import ReferenceCache
+
+media_genres = ReferenceCache("catalog.MediaGenre")
+staff_roles = ReferenceCache("catalog.StaffRole")
+companies = ReferenceCache("catalog.Company")
+
+REFERENCE_CACHES = (media_genres, staff_roles, companies)
@@ -5,3 +5,13 @@ SERIES_TYPES = (
     (SERIES_TYPE_TV, "Television Series"),
     (SERIES_TYPE_ANIME, "Anime Series"),
 )
+
+SEARCH_MODE_FULL = "full"
+SEARCH_MODE_PREFIX = "prefix"
+
+SEARCH_MODES = (
+    (SEARCH_MODE_FULL, "Full"),
+    (SEARCH_MODE_PREFIX, "Prefix"),
+)
+
+EMBEDDED_STAFF_LIMIT = 10
@@ -0,0 +1,56 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    OpenApiExample,
+    OpenApiParameter,
+    OpenApiResponse,
+    extend_schema,
+)
+
+import medialibrary.catalog.constants as catalog_c
+
+search_extend_schema = extend_schema(
+    summary="Search movies, series, games and persons",
+    description="""Returns the best matches of every media type and persons
+        in a single request. The `prefix` mode matches names and titles
+        starting with the text, in alphabetical order, and is meant for
+        typeahead.""",
+    parameters=[
+        OpenApiParameter(
+            name="q", type=OpenApiTypes.STR, required=True, description="Search text"
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=OpenApiTypes.INT,
+            description="Results per type, 5 by default and 20 at most",
+        ),
+        OpenApiParameter(
+            name="mode",
+            type=OpenApiTypes.STR,
+            enum=[mode for mode, _ in catalog_c.SEARCH_MODES],
+            description="Search mode, `full` by default",
+        ),
+    ],
+    responses={
+        200: OpenApiResponse(
+            description="Search results grouped by type",
+            response=OpenApiTypes.OBJECT,
+            examples=[
+                OpenApiExample(
+                    "Success Response",
+                    value={
+                        "movies": [{"id": 1, "title": "The Matrix"}],
+                        "series": [],
+                        "games": [{"id": 4, "title": "The Matrix: Path of Neo"}],
+                        "persons": [],
+                    },
+                )
+            ],
+        ),
+        400: OpenApiResponse(
+            description="Validation error",
+            examples=[
+                OpenApiExample("Error", value={"q": ["This field is required."]})
+            ],
+        ),
+    },
+)
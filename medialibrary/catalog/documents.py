@@ -0,0 +1,120 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+import medialibrary.catalog.models as catalog_m
+import medialibrary.catalog.serializers as catalog_s
+import medialibrary.common.constants as common_c
+
+DOCUMENTS = {
+    catalog_m.Movie: (catalog_m.MovieDocument, catalog_s.MovieListSerializer),
+    catalog_m.Series: (catalog_m.SeriesDocument, catalog_s.SeriesListSerializer),
+    catalog_m.Game: (catalog_m.GameDocument, catalog_s.GameListSerializer),
+}
+
+RATINGS = {
+    catalog_m.MovieRating: catalog_m.Movie,
+    catalog_m.SeriesRating: catalog_m.Series,
+    catalog_m.GameRating: catalog_m.Game,
+}
+
+
+def get_document_queryset(model):
+    _, serializer_class = DOCUMENTS[model]
+    return serializer_class.setup_eager_loading(
+        model.objects.annotate(rating=catalog_m.media_rating())
+    )
+
+
+def build_documents(model, queryset):
+    """
+    Returns `{pk: data}` for the items of the queryset, as rendered by the list
+    serializer of the model.
+    """
+    _, serializer_class = DOCUMENTS[model]
+    return {obj.pk: serializer_class(obj).data for obj in queryset}
+
+
+def refresh_documents(model, pks=None, batch_size=500):
+    """
+    Rebuilds the documents of the items with `pks`, or of all items, in
+    batches. Returns the number of documents written.
+    """
+    document_model, _ = DOCUMENTS[model]
+    related_name = model._meta.model_name
+    queryset = get_document_queryset(model).order_by("pk")
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+
+    written, last_pk = 0, 0
+    while True:
+        batch = build_documents(model, queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return written
+
+        document_model.objects.bulk_create(
+            [
+                document_model(**{f"{related_name}_id": pk}, data=data)
+                for pk, data in batch.items()
+            ],
+            update_conflicts=True,
+            unique_fields=[related_name],
+            update_fields=["data", "updated_at"],
+        )
+        written += len(batch)
+        last_pk = max(batch)
+
+
+def schedule_refresh(model, pks):
+    if not settings.CATALOG_READ_MODEL:
+        return
+
+    pks = sorted(set(pks))
+    if pks:
+        import medialibrary.catalog.tasks as catalog_t
+
+        transaction.on_commit(
+            partial(catalog_t.refresh_catalog_documents.delay, model._meta.label, pks)
+        )
+
+
+def media_saved(sender, instance, **kwargs):
+    schedule_refresh(sender, [instance.pk])
+
+
+def media_genres_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            schedule_refresh(type(instance), [instance.pk])
+    elif action in ("post_add", "post_remove"):
+        schedule_refresh(model, pk_set)
+    elif action == "pre_clear":
+        schedule_refresh(
+            model, model.objects.filter(genres=instance).values_list("pk", flat=True)
+        )
+
+
+def media_genre_changed(sender, instance, **kwargs):
+    for model in DOCUMENTS:
+        schedule_refresh(
+            model,
+            model.objects.filter(genre_ids__contains=[instance.pk]).values_list(
+                "pk", flat=True
+            ),
+        )
+
+
+def poster_changed(sender, instance, **kwargs):
+    if instance.type != common_c.PHOTO_TYPE_POSTER:
+        return
+
+    for model in DOCUMENTS:
+        schedule_refresh(
+            model, model.objects.filter(poster=instance).values_list("pk", flat=True)
+        )
+
+
+def rating_changed(sender, instance, **kwargs):
+    model = RATINGS[sender]
+    schedule_refresh(model, [getattr(instance, f"{model._meta.model_name}_id")])
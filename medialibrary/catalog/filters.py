@@ -1,41 +1,114 @@
+from datetime import date
+
+from django import forms
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 
+import medialibrary.catalog.cache as catalog_cache
 import medialibrary.catalog.models as catalog_m
+from medialibrary.catalog.search import search
+
+
+class YearFilter(filters.NumberFilter):
+    """
+    Filters a date field by year with plain date comparisons, so the lookup
+    can use an index on the date column instead of extracting the year.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("min_value", date.min.year)
+        kwargs.setdefault("max_value", date.max.year - 1)
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+
+        start = date(int(value), 1, 1)
+        end = date(int(value) + 1, 1, 1)
+        if self.lookup_expr == "gte":
+            lookups = {f"{self.field_name}__gte": start}
+        elif self.lookup_expr == "lte":
+            lookups = {f"{self.field_name}__lt": end}
+        else:
+            lookups = {f"{self.field_name}__gte": start, f"{self.field_name}__lt": end}
+
+        if self.distinct:
+            qs = qs.distinct()
+        return self.get_method(qs)(**lookups)
+
+
+class MediaGenreMultipleChoiceField(forms.TypedMultipleChoiceField):
+    """
+    Validates genre ids against the cached genres. Ids the cache doesn't know
+    yet check its shared version, so genres created elsewhere are found without
+    reloading the table for made up ids.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("coerce", int)
+        kwargs["choices"] = lambda: [
+            (pk, genre.name) for pk, genre in catalog_cache.media_genres.all().items()
+        ]
+        super().__init__(*args, **kwargs)
+
+    def valid_value(self, value):
+        try:
+            pk = int(value)
+        except (TypeError, ValueError):
+            return False
+        return catalog_cache.media_genres.get(pk) is not None
+
+
+@extend_schema_field(OpenApiTypes.INT)
+class AllGenresFilter(filters.MultipleChoiceFilter):
+    """
+    Matches items that have all of the selected genres with an array
+    containment lookup on the GIN-indexed `genre_ids` column.
+    """
+
+    field_class = MediaGenreMultipleChoiceField
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("field_name", "genre_ids")
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.filter(**{f"{self.field_name}__contains": sorted(set(value))})
 
 
 class PersonFilter(filters.FilterSet):
+    search = filters.CharFilter(method="filter_search", label="Search")
+
     class Meta:
         model = catalog_m.Person
         fields = {
             "name": ["icontains"],
         }
 
+    def filter_search(self, queryset, name, value):
+        return search(queryset, value, "name", config="simple")
+
 
 class MediaContentFilter(filters.FilterSet):
-    release_date = filters.NumberFilter(
-        field_name="release_date",
-        lookup_expr="year",
-    )
-    release_date__gte = filters.NumberFilter(
-        field_name="release_date",
-        lookup_expr="year__gte",
-    )
-    release_date__lte = filters.NumberFilter(
-        field_name="release_date",
-        lookup_expr="year__lte",
-    )
-    genres = filters.ModelMultipleChoiceFilter(
-        field_name="genres",
-        queryset=catalog_m.MediaGenre.objects.all(),
-        label="Genres",
-        conjoined=True,
-    )
+    release_date = YearFilter(field_name="release_date")
+    release_date__gte = YearFilter(field_name="release_date", lookup_expr="gte")
+    release_date__lte = YearFilter(field_name="release_date", lookup_expr="lte")
+    genres = AllGenresFilter(label="Genres")
+    search = filters.CharFilter(method="filter_search", label="Search")
 
     class Meta:
         fields = {
             "title": ["icontains"],
         }
 
+    def filter_search(self, queryset, name, value):
+        return search(queryset, value, "title")
+
 
 class MovieFilter(MediaContentFilter):
     class Meta(MediaContentFilter.Meta):
@@ -6,6 +6,8 @@ import pandas as pd
 import requests
 from django.db import transaction
 
+import medialibrary.catalog.cache as catalog_cache
+import medialibrary.catalog.documents as catalog_d
 import medialibrary.catalog.models as catalog_m
 
 
@@ -61,7 +63,7 @@ def get_staff_info(ids):
     url = "https://datasets.imdbws.com/title.principals.tsv.gz"
     ids_set = set(ids)
     results = []
-    columns = ["tconst", "nconst", "category"]
+    columns = ["tconst", "ordering", "nconst", "category"]
 
     with requests.get(url, stream=True) as response:
         response.raise_for_status()
@@ -113,6 +115,11 @@ def prepare_movie_data(movie_id, movies_basic, staff_info, people_info):
                     "imdb_id": staff_member["nconst"],
                     "name": person.iloc[0]["primaryName"],
                     "role": staff_member["category"],
+                    "billing": (
+                        int(staff_member["ordering"])
+                        if str(staff_member["ordering"]).isdigit()
+                        else None
+                    ),
                 }
             )
 
@@ -193,10 +200,12 @@ def update_or_create_movies(movies_data):
         if new_genres:
             catalog_m.MediaGenre.objects.bulk_create(new_genres)
             genres_map.update({g.name: g for g in new_genres})
+            catalog_cache.media_genres.invalidate()
 
         if new_roles:
             catalog_m.StaffRole.objects.bulk_create(new_roles)
             existing_roles.update({r.name: r for r in new_roles})
+            catalog_cache.staff_roles.invalidate()
 
         if persons_to_create:
             catalog_m.Person.objects.bulk_create(persons_to_create)
@@ -219,33 +228,67 @@ def update_or_create_movies(movies_data):
             )
 
         staff_to_create = []
+        staff_to_update = []
         for m in movies_data:
             movie = existing_movies.get(m["imdb_id"])
             if movie and m.get("staff"):
-                current_staff = set(
-                    catalog_m.Staff.objects.filter(movie=movie).values_list(
-                        "person__imdb_id", "role__name"
-                    )
-                )
+                current_staff = {
+                    (
+                        staff.person.imdb_id,
+                        staff.role.name if staff.role else None,
+                    ): staff
+                    for staff in catalog_m.Staff.objects.filter(
+                        movie=movie
+                    ).select_related("person", "role")
+                }
                 for s in m["staff"]:
-                    if (
+                    current = current_staff.get((s.get("imdb_id"), s["role"]))
+                    if current:
+                        if current.billing != s.get("billing"):
+                            current.billing = s.get("billing")
+                            staff_to_update.append(current)
+                    elif (
                         s.get("imdb_id")
                         and s["imdb_id"] in existing_persons
                         and s["role"] in existing_roles
-                        and (s["imdb_id"], s["role"]) not in current_staff
                     ):
                         staff_to_create.append(
                             catalog_m.Staff(
                                 person=existing_persons[s["imdb_id"]],
                                 movie=movie,
                                 role=existing_roles[s["role"]],
+                                billing=s.get("billing"),
                             )
                         )
 
         if staff_to_create:
             catalog_m.Staff.objects.bulk_create(staff_to_create)
+        if staff_to_update:
+            catalog_m.Staff.objects.bulk_update(staff_to_update, fields=["billing"])
 
+    # Genres are written to the M2M table in bulk, so `genre_ids` is refreshed
+    # here rather than by the m2m_changed handler.
+    movie_genres = {}
     for m in movies_data:
         movie = existing_movies.get(m["imdb_id"])
         if movie and m.get("genres"):
-            movie.genres.set([genres_map[g] for g in m["genres"] if g in genres_map])
+            movie_genres[movie.pk] = {
+                genres_map[g].pk for g in m["genres"] if g in genres_map
+            }
+
+    if movie_genres:
+        through = catalog_m.Movie.genres.through
+        with transaction.atomic():
+            through.objects.filter(movie_id__in=movie_genres).delete()
+            through.objects.bulk_create(
+                through(movie_id=movie_id, mediagenre_id=genre_id)
+                for movie_id, genre_ids in movie_genres.items()
+                for genre_id in genre_ids
+            )
+            catalog_m.refresh_genre_ids(
+                catalog_m.Movie.objects.filter(pk__in=movie_genres)
+            )
+
+    catalog_d.schedule_refresh(
+        catalog_m.Movie, [movie.pk for movie in existing_movies.values()]
+    )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+import medialibrary.catalog.documents as catalog_d
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the precomputed list documents of movies, series and games."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=[model._meta.model_name for model in catalog_d.DOCUMENTS],
+            help="Rebuild only this media type. Can be repeated.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model in catalog_d.DOCUMENTS:
+            if options["model"] and model._meta.model_name not in options["model"]:
+                continue
+
+            written = catalog_d.refresh_documents(
+                model, batch_size=options["batch_size"]
+            )
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {written} documents written"
+            )
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 14:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0004_game_search_vector_movie_search_vector_and_more"),
+        ("common", "0002_alter_photo_type_video"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                fields=["release_date", "id"], name="catalog_game_release_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["release_date", "id"], name="catalog_movie_release_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="series",
+            index=models.Index(
+                fields=["release_date", "id"], name="catalog_series_release_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2 on 2026-10-19 15:09
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Subquery
+
+
+def backfill_genre_ids(apps, schema_editor):
+    for model_name, item in (
+        ("Movie", "movie"),
+        ("Series", "series"),
+        ("Game", "game"),
+    ):
+        model = apps.get_model("catalog", model_name)
+        genre_ids = (
+            model.genres.through.objects.filter(**{item: OuterRef("pk")})
+            .order_by()
+            .values(item)
+            .annotate(ids=ArrayAgg("mediagenre_id", ordering="mediagenre_id"))
+            .values("ids")
+        )
+        model.objects.annotate(has_genres=Exists(genre_ids)).filter(
+            has_genres=True
+        ).update(genre_ids=Subquery(genre_ids))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0005_release_date_indexes"),
+        ("common", "0002_alter_photo_type_video"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="genre_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="genre_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="series",
+            name="genre_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["genre_ids"], name="catalog_game_genre_ids_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["genre_ids"], name="catalog_movie_genre_ids_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="series",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["genre_ids"], name="catalog_series_genre_ids_gin"
+            ),
+        ),
+        migrations.RunPython(backfill_genre_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2 on 2026-10-19 15:30
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0006_media_genre_ids"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GameDocument",
+            fields=[
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "game",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="document",
+                        serialize=False,
+                        to="catalog.game",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Game Document",
+                "verbose_name_plural": "Game Documents",
+            },
+        ),
+        migrations.CreateModel(
+            name="MovieDocument",
+            fields=[
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "movie",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="document",
+                        serialize=False,
+                        to="catalog.movie",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Movie Document",
+                "verbose_name_plural": "Movie Documents",
+            },
+        ),
+        migrations.CreateModel(
+            name="SeriesDocument",
+            fields=[
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "series",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="document",
+                        serialize=False,
+                        to="catalog.series",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Series Document",
+                "verbose_name_plural": "Series Documents",
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-19 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0007_media_documents"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="staff",
+            options={
+                "ordering": [
+                    models.OrderBy(models.F("billing"), nulls_last=True),
+                    "id",
+                ],
+                "verbose_name": "Staff",
+                "verbose_name_plural": "Staff",
+            },
+        ),
+        migrations.AddField(
+            model_name="staff",
+            name="billing",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="staff",
+            index=models.Index(
+                models.F("movie"),
+                models.OrderBy(models.F("billing"), nulls_last=True),
+                models.F("id"),
+                name="catalog_staff_movie_billing",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="staff",
+            index=models.Index(
+                models.F("series"),
+                models.OrderBy(models.F("billing"), nulls_last=True),
+                models.F("id"),
+                name="catalog_staff_series_billing",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0008_staff_billing"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="staff",
+            index=models.Index(
+                fields=["person", "-id"], name="catalog_staff_person_id"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="staff",
+            index=models.Index(
+                fields=["person", "role", "-id"], name="catalog_staff_person_role_id"
+            ),
+        ),
+    ]
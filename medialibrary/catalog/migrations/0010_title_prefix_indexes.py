@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-19 17:53
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_staff_filmography_indexes"),
+        ("common", "0007_video_hls"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate(
+                    django.db.models.functions.text.Upper("title"), "C"
+                ),
+                name="catalog_game_title_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate(
+                    django.db.models.functions.text.Upper("title"), "C"
+                ),
+                name="catalog_movie_title_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate(
+                    django.db.models.functions.text.Upper("name"), "C"
+                ),
+                name="catalog_person_name_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="series",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate(
+                    django.db.models.functions.text.Upper("title"), "C"
+                ),
+                name="catalog_series_title_prefix",
+            ),
+        ),
+    ]
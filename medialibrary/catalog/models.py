@@ -1,17 +1,99 @@
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Avg, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Collate, Round, Upper
 
 import medialibrary.catalog.constants as catalog_c
+from medialibrary.utils.drf import invalidate_representations
 from medialibrary.utils.models import TimeStampedModel
 
 
+def media_search_vector():
+    return SearchVector("title", weight="A", config="english") + SearchVector(
+        "description", weight="B", config="english"
+    )
+
+
+def media_rating():
+    return Coalesce(Round(Avg("ratings__rating"), 2), 0.0)
+
+
+def refresh_genre_ids(queryset):
+    """
+    Rewrites the denormalized `genre_ids` of the queryset items from the
+    `genres` M2M table in one UPDATE. `updated_at` is left as is, so cached
+    representations are invalidated separately.
+    """
+    invalidate_representations()
+    field = queryset.model._meta.get_field("genres")
+    item, genre = field.m2m_field_name(), field.m2m_reverse_field_name()
+    genre_ids = (
+        field.remote_field.through.objects.filter(**{item: OuterRef("pk")})
+        .order_by()
+        .values(item)
+        .annotate(ids=ArrayAgg(f"{genre}_id", ordering=f"{genre}_id"))
+        .values("ids")
+    )
+    return queryset.update(
+        genre_ids=Coalesce(
+            Subquery(genre_ids),
+            Value([], output_field=ArrayField(models.BigIntegerField())),
+        )
+    )
+
+
+def sync_genre_ids(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # Keeps `genre_ids` in step with `genres` changes made from either side of
+    # the relation.
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        refresh_genre_ids(type(instance).objects.filter(pk=instance.pk))
+        instance.genre_ids = (
+            type(instance)
+            .objects.values_list("genre_ids", flat=True)
+            .get(pk=instance.pk)
+        )
+    elif action == "post_clear":
+        refresh_genre_ids(model.objects.filter(genre_ids__contains=[instance.pk]))
+    else:
+        refresh_genre_ids(model.objects.filter(pk__in=pk_set))
+
+
+def drop_deleted_genre_ids(sender, instance, **kwargs):
+    for model in (Movie, Series, Game):
+        refresh_genre_ids(model.objects.filter(genre_ids__contains=[instance.pk]))
+
+
 class Person(TimeStampedModel):
     imdb_id = models.TextField(null=True, blank=True, unique=True)
     name = models.TextField()
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", config="simple"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Person"
         verbose_name_plural = "Persons"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="catalog_person_search_gin"),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="catalog_person_name_trgm",
+            ),
+            # "C" collated so typeahead prefix matches and their order share it.
+            models.Index(
+                Collate(Upper("name"), "C"), name="catalog_person_name_prefix"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name}"
@@ -50,10 +132,31 @@ class Staff(TimeStampedModel):
         blank=True,
     )
     role = models.ForeignKey("catalog.StaffRole", on_delete=models.SET_NULL, null=True)
+    billing = models.PositiveIntegerField(null=True, blank=True)
 
     class Meta:
         verbose_name = "Staff"
         verbose_name_plural = "Staff"
+        ordering = [F("billing").asc(nulls_last=True), "id"]
+        indexes = [
+            models.Index(
+                "movie",
+                F("billing").asc(nulls_last=True),
+                "id",
+                name="catalog_staff_movie_billing",
+            ),
+            models.Index(
+                "series",
+                F("billing").asc(nulls_last=True),
+                "id",
+                name="catalog_staff_series_billing",
+            ),
+            # Filmography pages, latest credits first, with or without a role.
+            models.Index(fields=["person", "-id"], name="catalog_staff_person_id"),
+            models.Index(
+                fields=["person", "role", "-id"], name="catalog_staff_person_role_id"
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=(
@@ -104,16 +207,39 @@ class Movie(TimeStampedModel):
         blank=True,
     )
     genres = models.ManyToManyField("catalog.MediaGenre", related_name="movies")
+    genre_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True, editable=False
+    )
     company = models.ForeignKey(
         "catalog.Company", on_delete=models.SET_NULL, null=True, blank=True
     )
     staff = models.ManyToManyField(
         "catalog.Person", through="catalog.Staff", related_name="movies"
     )
+    search_vector = models.GeneratedField(
+        expression=media_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Movie"
         verbose_name_plural = "Movies"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="catalog_movie_search_gin"),
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="catalog_movie_title_trgm",
+            ),
+            # "C" collated so typeahead prefix matches and their order share it.
+            models.Index(
+                Collate(Upper("title"), "C"), name="catalog_movie_title_prefix"
+            ),
+            models.Index(
+                fields=["release_date", "id"], name="catalog_movie_release_idx"
+            ),
+            GinIndex(fields=["genre_ids"], name="catalog_movie_genre_ids_gin"),
+        ]
 
     def __str__(self):
         return self.title
@@ -155,16 +281,39 @@ class Series(TimeStampedModel):
         blank=True,
     )
     genres = models.ManyToManyField("catalog.MediaGenre", related_name="series")
+    genre_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True, editable=False
+    )
     company = models.ForeignKey(
         "catalog.Company", on_delete=models.SET_NULL, null=True, blank=True
     )
     staff = models.ManyToManyField(
         "catalog.Person", through="catalog.Staff", related_name="series"
     )
+    search_vector = models.GeneratedField(
+        expression=media_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Series"
         verbose_name_plural = "Series"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="catalog_series_search_gin"),
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="catalog_series_title_trgm",
+            ),
+            # "C" collated so typeahead prefix matches and their order share it.
+            models.Index(
+                Collate(Upper("title"), "C"), name="catalog_series_title_prefix"
+            ),
+            models.Index(
+                fields=["release_date", "id"], name="catalog_series_release_idx"
+            ),
+            GinIndex(fields=["genre_ids"], name="catalog_series_genre_ids_gin"),
+        ]
 
     def __str__(self):
         return self.title
@@ -203,13 +352,36 @@ class Game(TimeStampedModel):
         blank=True,
     )
     genres = models.ManyToManyField("catalog.MediaGenre", related_name="games")
+    genre_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True, editable=False
+    )
     company = models.ForeignKey(
         "catalog.Company", on_delete=models.SET_NULL, null=True, blank=True
     )
+    search_vector = models.GeneratedField(
+        expression=media_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Game"
         verbose_name_plural = "Games"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="catalog_game_search_gin"),
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="catalog_game_title_trgm",
+            ),
+            # "C" collated so typeahead prefix matches and their order share it.
+            models.Index(
+                Collate(Upper("title"), "C"), name="catalog_game_title_prefix"
+            ),
+            models.Index(
+                fields=["release_date", "id"], name="catalog_game_release_idx"
+            ),
+            GinIndex(fields=["genre_ids"], name="catalog_game_genre_ids_gin"),
+        ]
 
     def __str__(self):
         return self.title
@@ -234,3 +406,55 @@ class GameRating(TimeStampedModel):
 
     def __str__(self):
         return self.game.title
+
+
+class MediaDocument(models.Model):
+    """
+    Precomputed list representation of a movie, series or game, served by the
+    list endpoints when `CATALOG_READ_MODEL` is enabled.
+    """
+
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class MovieDocument(MediaDocument):
+    movie = models.OneToOneField(
+        "catalog.Movie",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="document",
+    )
+
+    class Meta:
+        verbose_name = "Movie Document"
+        verbose_name_plural = "Movie Documents"
+
+
+class SeriesDocument(MediaDocument):
+    series = models.OneToOneField(
+        "catalog.Series",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="document",
+    )
+
+    class Meta:
+        verbose_name = "Series Document"
+        verbose_name_plural = "Series Documents"
+
+
+class GameDocument(MediaDocument):
+    game = models.OneToOneField(
+        "catalog.Game",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="document",
+    )
+
+    class Meta:
+        verbose_name = "Game Document"
+        verbose_name_plural = "Game Documents"
@@ -0,0 +1,72 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q, Value
+from django.db.models.functions import Collate, Length, Upper
+
+import medialibrary.catalog.models as catalog_m
+
+SEARCH_GROUPS = (
+    ("movies", catalog_m.Movie, "title", "english"),
+    ("series", catalog_m.Series, "title", "english"),
+    ("games", catalog_m.Game, "title", "english"),
+    ("persons", catalog_m.Person, "name", "simple"),
+)
+
+
+def search(queryset, value, field, config="english"):
+    """
+    Full-text search on `search_vector` combined with substring and trigram
+    similarity matching on `Upper(field)`, ordered by relevance.
+
+    Every branch is served by a GIN index: `search_vector` for the full-text
+    match and the `gin_trgm_ops` index on `Upper(field)` for the others.
+    """
+    query = SearchQuery(value, config=config, search_type="websearch")
+    return (
+        queryset.alias(search_field=Upper(field))
+        .filter(
+            Q(search_vector=query)
+            | Q(search_field__contains=value.upper())
+            | Q(search_field__trigram_similar=value.upper())
+        )
+        .annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+            + TrigramSimilarity(field, value)
+        )
+        .order_by("-search_rank", "pk")
+    )
+
+
+def prefix_search(queryset, value, field, config="english"):
+    """
+    Typeahead search: items whose `field` starts with `value`, ignoring case,
+    in alphabetical order. The matches are read in that order from the "C"
+    collated index on `Upper(field)`, so a short prefix only touches the rows
+    it returns. `config` is unused, for the signature of `search()`.
+    """
+    value = value.upper()
+    return (
+        queryset.alias(search_field=Collate(Upper(field), "C"))
+        .filter(search_field__startswith=value)
+        .annotate(search_rank=Value(float(len(value))) / Length(field))
+        .order_by("search_field")
+    )
+
+
+def search_all(value, limit, prefix=False):
+    """
+    Top `limit` results per group of `SEARCH_GROUPS`, fetched in one
+    UNION ALL query.
+    """
+    search_func = prefix_search if prefix else search
+    querysets = [
+        search_func(model.objects.all(), value, field, config=config)
+        .annotate(search_group=Value(group), search_title=F(field))
+        .values_list("search_group", "id", "search_title", "search_rank")[:limit]
+        for group, model, field, config in SEARCH_GROUPS
+    ]
+
+    results = {group: [] for group, *_ in SEARCH_GROUPS}
+    rows = querysets[0].union(*querysets[1:], all=True)
+    for group, pk, title, rank in sorted(rows, key=lambda row: -row[3]):
+        results[group].append({"id": pk, "title": title})
+    return results
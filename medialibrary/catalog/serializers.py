@@ -1,8 +1,19 @@
+from django.db import models
+from django.db.models import Prefetch
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+import medialibrary.catalog.cache as catalog_cache
+import medialibrary.catalog.constants as catalog_c
 import medialibrary.catalog.models as catalog_m
 import medialibrary.common.serializers as common_s
-from medialibrary.utils.drf import ReadablePKRF
+from medialibrary.utils.drf import (
+    CachedListField,
+    CachedPKRF,
+    DynamicFieldsMixin,
+    ReadablePKRF,
+)
 
 
 class MediaGenreSerializer(serializers.ModelSerializer):
@@ -11,42 +22,141 @@ class MediaGenreSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+@extend_schema_field(OpenApiTypes.STR)
+class MediaGenreNameField(serializers.Field):
+    def to_representation(self, genre):
+        return genre.name
+
+
 class PersonSerializer(serializers.ModelSerializer):
     class Meta:
         model = catalog_m.Person
+        exclude = ("search_vector",)
+
+
+class StaffRoleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = catalog_m.StaffRole
         fields = "__all__"
 
 
 class StaffSerializer(serializers.ModelSerializer):
     person = ReadablePKRF(PersonSerializer)
+    role = CachedPKRF(StaffRoleSerializer, catalog_cache.staff_roles)
 
     class Meta:
         model = catalog_m.Staff
         fields = "__all__"
 
 
+class TopBilledStaffListSerializer(serializers.ListSerializer):
+    """
+    Renders the first `EMBEDDED_STAFF_LIMIT` staff entries by billing, the
+    rest is served by the `staff` action of the media viewsets.
+    """
+
+    prefetch_to_attr = "top_billed_staff"
+
+    @classmethod
+    def prefetch(cls, lookup):
+        return Prefetch(
+            lookup,
+            queryset=catalog_m.Staff.objects.select_related("person")[
+                : catalog_c.EMBEDDED_STAFF_LIMIT
+            ],
+            to_attr=cls.prefetch_to_attr,
+        )
+
+    def get_attribute(self, instance):
+        if hasattr(instance, self.prefetch_to_attr):
+            return getattr(instance, self.prefetch_to_attr)
+        return super().get_attribute(instance)
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        return super().to_representation(data[: catalog_c.EMBEDDED_STAFF_LIMIT])
+
+
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
         model = catalog_m.Company
         fields = "__all__"
 
 
-class MovieSerializer(serializers.ModelSerializer):
-    genres = MediaGenreSerializer(many=True, read_only=True)
-    company = ReadablePKRF(CompanySerializer)
+class MovieSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    genres = CachedListField(
+        MediaGenreSerializer, catalog_cache.media_genres, source="genre_ids"
+    )
+    company = CachedPKRF(CompanySerializer, catalog_cache.companies)
     poster = ReadablePKRF(common_s.PhotoSerializer)
-    movie_staff = StaffSerializer(many=True, read_only=True)
+    movie_staff = TopBilledStaffListSerializer(child=StaffSerializer(), read_only=True)
     rating = serializers.FloatField(read_only=True)
     videos = common_s.VideoSerializer(many=True, read_only=True)
     photos = common_s.PhotoSerializer(many=True, read_only=True)
 
     class Meta:
         model = catalog_m.Movie
-        exclude = ("staff",)
+        exclude = ("staff", "search_vector", "genre_ids")
+        expandable_fields = (
+            "genres",
+            "company",
+            "poster",
+            "movie_staff",
+            "videos",
+            "photos",
+        )
+
+
+class MediaListSerializer(serializers.ModelSerializer):
+    year = serializers.IntegerField(
+        source="release_date.year", read_only=True, allow_null=True
+    )
+    poster = serializers.ImageField(
+        source="poster.photo", read_only=True, allow_null=True
+    )
+    poster_srcset = common_s.SrcsetField(source="poster.variants", allow_null=True)
+    rating = serializers.FloatField(read_only=True)
+    genres = serializers.ListField(
+        child=serializers.IntegerField(), source="genre_ids", read_only=True
+    )
+    # Names of the `genres` ids, from the cache.
+    genre_names = CachedListField(
+        MediaGenreNameField, catalog_cache.media_genres, source="genre_ids"
+    )
+
+    class Meta:
+        fields = (
+            "id",
+            "title",
+            "year",
+            "poster",
+            "poster_srcset",
+            "rating",
+            "genres",
+            "genre_names",
+        )
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related("poster").only(
+            "id",
+            "title",
+            "release_date",
+            "updated_at",
+            "genre_ids",
+            "poster__photo",
+            "poster__variants",
+        )
+
+
+class MovieListSerializer(MediaListSerializer):
+    class Meta(MediaListSerializer.Meta):
+        model = catalog_m.Movie
 
 
 class MovieRatingSerializer(serializers.ModelSerializer):
-    movie = ReadablePKRF(MovieSerializer)
+    movie = ReadablePKRF(MovieSerializer, list_serializer=MovieListSerializer)
 
     class Meta:
         model = catalog_m.MovieRating
@@ -54,22 +164,37 @@ class MovieRatingSerializer(serializers.ModelSerializer):
         read_only_fields = ("user",)
 
 
-class SeriesSerializer(serializers.ModelSerializer):
-    genres = MediaGenreSerializer(many=True, read_only=True)
-    company = ReadablePKRF(CompanySerializer)
+class SeriesSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    genres = CachedListField(
+        MediaGenreSerializer, catalog_cache.media_genres, source="genre_ids"
+    )
+    company = CachedPKRF(CompanySerializer, catalog_cache.companies)
     poster = ReadablePKRF(common_s.PhotoSerializer)
-    series_staff = StaffSerializer(many=True, read_only=True)
+    series_staff = TopBilledStaffListSerializer(child=StaffSerializer(), read_only=True)
     rating = serializers.FloatField(read_only=True)
     videos = common_s.VideoSerializer(many=True, read_only=True)
     photos = common_s.PhotoSerializer(many=True, read_only=True)
 
     class Meta:
         model = catalog_m.Series
-        exclude = ("staff",)
+        exclude = ("staff", "search_vector", "genre_ids")
+        expandable_fields = (
+            "genres",
+            "company",
+            "poster",
+            "series_staff",
+            "videos",
+            "photos",
+        )
+
+
+class SeriesListSerializer(MediaListSerializer):
+    class Meta(MediaListSerializer.Meta):
+        model = catalog_m.Series
 
 
 class SeriesRatingSerializer(serializers.ModelSerializer):
-    series = ReadablePKRF(SeriesSerializer)
+    series = ReadablePKRF(SeriesSerializer, list_serializer=SeriesListSerializer)
 
     class Meta:
         model = catalog_m.SeriesRating
@@ -77,9 +202,11 @@ class SeriesRatingSerializer(serializers.ModelSerializer):
         read_only_fields = ("user",)
 
 
-class GameSerializer(serializers.ModelSerializer):
-    genres = MediaGenreSerializer(many=True, read_only=True)
-    company = ReadablePKRF(CompanySerializer)
+class GameSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    genres = CachedListField(
+        MediaGenreSerializer, catalog_cache.media_genres, source="genre_ids"
+    )
+    company = CachedPKRF(CompanySerializer, catalog_cache.companies)
     poster = ReadablePKRF(common_s.PhotoSerializer)
     rating = serializers.FloatField(read_only=True)
     videos = common_s.VideoSerializer(many=True, read_only=True)
@@ -87,13 +214,60 @@ class GameSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = catalog_m.Game
-        fields = "__all__"
+        exclude = ("search_vector", "genre_ids")
+        expandable_fields = ("genres", "company", "poster", "videos", "photos")
+
+
+class GameListSerializer(MediaListSerializer):
+    class Meta(MediaListSerializer.Meta):
+        model = catalog_m.Game
+
+
+class FilmographySerializer(serializers.ModelSerializer):
+    movie = MovieListSerializer(read_only=True)
+    series = SeriesListSerializer(read_only=True)
+    role = CachedPKRF(StaffRoleSerializer, catalog_cache.staff_roles)
+
+    class Meta:
+        model = catalog_m.Staff
+        fields = ("id", "movie", "series", "role", "billing")
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # The role is rendered from the reference cache, so one query loads
+        # the whole page.
+        return queryset.select_related("movie__poster", "series__poster").only(
+            "id",
+            "role_id",
+            "billing",
+            *(
+                f"{media}__{field}"
+                for media in ("movie", "series")
+                for field in (
+                    "id",
+                    "title",
+                    "release_date",
+                    "updated_at",
+                    "genre_ids",
+                    "poster__photo",
+                    "poster__variants",
+                )
+            ),
+        )
 
 
 class GameRatingSerializer(serializers.ModelSerializer):
-    game = ReadablePKRF(GameSerializer)
+    game = ReadablePKRF(GameSerializer, list_serializer=GameListSerializer)
 
     class Meta:
         model = catalog_m.GameRating
         fields = "__all__"
         read_only_fields = ("user",)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=5)
+    mode = serializers.ChoiceField(
+        choices=catalog_c.SEARCH_MODES, default=catalog_c.SEARCH_MODE_FULL
+    )
@@ -1,7 +1,9 @@
 import logging
 
 from celery import shared_task
+from django.apps import apps
 
+import medialibrary.catalog.documents as catalog_d
 from medialibrary.catalog.imdb import (
     get_people_info,
     get_staff_info,
@@ -26,3 +28,12 @@ def fetch_movies():
         update_or_create_movies(movies_data)
     except Exception as e:
         logger.error(f"Failed to fetch movies: {type(e)} {e}")
+
+
+@shared_task
+def refresh_catalog_documents(model_label, pks):
+    """
+    Rebuilds the documents of the `model_label` items with `pks`, off the
+    request that changed them.
+    """
+    catalog_d.refresh_documents(apps.get_model(model_label), pks)
@@ -1,17 +1,39 @@
+import gzip
+import json
 import tempfile
-from datetime import timedelta
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
 from random import choice, sample
+from unittest import mock, skipUnless
 
 from django.core.files import File
-from django.test import override_settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient, APITestCase
 
+import medialibrary.catalog.cache as catalog_cache
+import medialibrary.catalog.constants as catalog_c
+import medialibrary.catalog.filters as catalog_f
+import medialibrary.catalog.imdb as catalog_imdb
 import medialibrary.catalog.models as catalog_m
+import medialibrary.catalog.serializers as catalog_s
+import medialibrary.catalog.tasks as catalog_t
 import medialibrary.common.constants as common_c
 import medialibrary.common.models as common_m
 import medialibrary.users.models as users_m
+from medialibrary.catalog.search import prefix_search, search
+from medialibrary.utils.cache import ReferenceCache
+from medialibrary.utils.middleware import brotli
+from medialibrary.utils.parsers import FastJSONParser
+from medialibrary.utils.renderers import FastJSONRenderer
 
 TEMP_MEDIA = tempfile.mktemp()
 
@@ -203,12 +225,327 @@ class TestMovieVS(APITestCase):
         self.assertIsInstance(response.data, dict)
 
     def test_queries_movies(self):
+        # 2 - select movies with poster with pagination
+        # 1 - select genres into the cache
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/catalog/movie/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # genre names are read from the cache
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/catalog/movie/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_movies_compact(self):
+        response = self.client.get("/api/catalog/movie/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        movie = response.data["results"][0]
+        self.assertEqual(
+            set(movie),
+            {
+                "id",
+                "title",
+                "year",
+                "poster",
+                "poster_srcset",
+                "rating",
+                "genres",
+                "genre_names",
+            },
+        )
+        self.assertEqual(movie["year"], 2024)
+        genres = catalog_m.MediaGenre.objects.filter(movies=movie["id"]).order_by("pk")
+        self.assertEqual(movie["genres"], [genre.pk for genre in genres])
+        self.assertEqual(movie["genre_names"], [genre.name for genre in genres])
+
+    def test_queries_retrieve_movies(self):
+        # 1 - select movie
+        # 2 - select photo, videos
+        # 1 - select staff with person
+        # 3 - select genres, companies, staff roles into the cache
+        with self.assertNumQueries(7):
+            response = self.client.get(f"/api/catalog/movie/{self.movies[0].pk}/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("movie_staff", response.data)
+
+        # genres, company and staff roles are read from the cache
+        with self.assertNumQueries(4):
+            response = self.client.get(f"/api/catalog/movie/{self.movies[1].pk}/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data["company"], dict)
+        self.assertIsInstance(response.data["genres"][0], dict)
+        self.assertIsInstance(response.data["movie_staff"][0]["role"], dict)
+
+    def test_sparse_fields_movies(self):
         # 2 - select movies with pagination
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/catalog/movie/?fields=id,title,company")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        movie = response.data["results"][0]
+        self.assertEqual(set(movie), {"id", "title", "company"})
+        self.assertIsInstance(movie["company"], int)
+
+    def test_expand_movies(self):
+        # 2 - select movies with company with pagination
+        # 1 - select genres
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                "/api/catalog/movie/?fields=id,company,genres&expand=company"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        movie = response.data["results"][0]
+        self.assertIsInstance(movie["company"], dict)
+        self.assertTrue(all(isinstance(genre, int) for genre in movie["genres"]))
+
+    def test_filter_genres_movies(self):
+        genres = self.genres[:2]
+        self.movies[0].genres.set(genres)
+        self.movies[1].genres.set(genres[:1])
+        query = "&".join(f"genres={genre.pk}" for genre in genres)
+
+        # 1 - select genres into the cache
+        # 2 - select movies with poster with pagination
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/catalog/movie/?{query}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        ids = {movie["id"] for movie in response.data["results"]}
+        self.assertIn(self.movies[0].pk, ids)
+        self.assertNotIn(self.movies[1].pk, ids)
+        for movie in response.data["results"]:
+            self.assertTrue({genre.pk for genre in genres} <= set(movie["genres"]))
+
+        # genre ids are validated from the cache
+        with self.assertNumQueries(2):
+            self.client.get(f"/api/catalog/movie/?{query}")
+
+    def test_filter_unknown_genre_movies(self):
+        response = self.client.get("/api/catalog/movie/?genres=0")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        genre = catalog_m.MediaGenre.objects.create(name="genre5")
+        response = self.client.get(f"/api/catalog/movie/?genres={genre.pk}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 0)
+
+    def test_bulk_movies(self):
+        ids = [self.movies[2].pk, self.movies[0].pk, self.movies[1].pk]
+        self.client.get(f"/api/catalog/movie/bulk/?ids={ids[0]}")
+
+        # 1 - select movies
         # 2 - select photo, videos
-        # 2 - select staff, genres
-        with self.assertNumQueries(6):
-            response = self.client.get("/api/catalog/movie/")
+        # 1 - select staff with person
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                f"/api/catalog/movie/bulk/?ids={','.join(map(str, ids))},999999"
+            )
             self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([movie["id"] for movie in response.data], ids)
+        self.assertIn("movie_staff", response.data[0])
+
+        response = self.client.post(
+            "/api/catalog/movie/bulk/", {"ids": ids[::-1]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([movie["id"] for movie in response.data], ids[::-1])
+
+    def test_bulk_validation(self):
+        response = self.client.get("/api/catalog/movie/bulk/?ids=1,a")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            "/api/catalog/person/bulk/", {"ids": list(range(1, 202))}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_persons(self):
+        ids = [self.persons[1].pk, self.persons[0].pk]
+        response = self.client.get(
+            f"/api/catalog/person/bulk/?ids={ids[0]},{ids[1]},{ids[0]}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([person["id"] for person in response.data], ids)
+
+    def test_embedded_staff_top_billed(self):
+        movie = self.movies[0]
+        catalog_m.Staff.objects.bulk_create(
+            catalog_m.Staff(
+                person=self.persons[billing % len(self.persons)],
+                movie=movie,
+                role=self.staff_roles[0],
+                billing=billing,
+            )
+            for billing in range(15, 0, -1)
+        )
+
+        response = self.client.get(f"/api/catalog/movie/{movie.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [staff["billing"] for staff in response.data["movie_staff"]],
+            list(range(1, catalog_c.EMBEDDED_STAFF_LIMIT + 1)),
+        )
+        top_billed = [staff["id"] for staff in response.data["movie_staff"]]
+
+        # Collapsed to ids, the staff is limited the same way.
+        for url in (
+            f"/api/catalog/movie/{movie.pk}/?fields=id,movie_staff",
+            f"/api/catalog/movie/bulk/?ids={movie.pk}&fields=id,movie_staff",
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = (
+                response.data[0] if isinstance(response.data, list) else response.data
+            )
+            self.assertEqual(data["movie_staff"], top_billed)
+
+        # 1 - select movie
+        # 2 - select staff with person with pagination
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f"/api/catalog/movie/{movie.pk}/staff/?page_size=10&page=2"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 17)
+        self.assertEqual(
+            [staff["billing"] for staff in response.data["results"]],
+            list(range(11, 16)) + [None, None],
+        )
+
+        response = self.client.get("/api/catalog/movie/999999/staff/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_person_filmography(self):
+        person = self.persons[0]
+        series = catalog_m.Series.objects.create(title="Test Series")
+        catalog_m.Staff.objects.bulk_create(
+            [
+                catalog_m.Staff(person=person, movie=movie, role=self.staff_roles[0])
+                for movie in self.movies
+            ]
+            + [catalog_m.Staff(person=person, series=series, role=self.staff_roles[1])]
+        )
+        # Roles and genres come from the warm reference caches.
+        catalog_cache.staff_roles.all()
+        catalog_cache.media_genres.all()
+
+        # 1 - select person
+        # 2 - select staff with movies, series and posters
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                f"/api/catalog/person/{person.pk}/filmography/?page_size=3"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        first_page = response.data["results"]
+        self.assertEqual(first_page[0]["series"]["title"], "Test Series")
+        self.assertIsNone(first_page[0]["movie"])
+        self.assertEqual(first_page[0]["role"]["name"], self.staff_roles[1].name)
+        self.assertEqual(first_page[1]["movie"]["title"], "Test Movie 4")
+        self.assertEqual(first_page[1]["movie"]["year"], 2024)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(
+            [staff["movie"]["title"] for staff in response.data["results"]],
+            ["Test Movie 2", "Test Movie 1"],
+        )
+
+        response = self.client.get(
+            f"/api/catalog/person/{person.pk}/filmography/",
+            {"role": self.staff_roles[1].pk},
+        )
+        self.assertEqual(
+            [staff["id"] for staff in response.data["results"]],
+            [first_page[0]["id"]],
+        )
+
+        response = self.client.get(
+            f"/api/catalog/person/{person.pk}/filmography/", {"role": "actor"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get("/api/catalog/person/999999/filmography/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filmography_uses_person_index(self):
+        person = self.persons[0]
+        role = self.staff_roles[0]
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("SET enable_sort = off")
+        try:
+            for queryset, index in (
+                (
+                    catalog_m.Staff.objects.filter(person=person),
+                    "catalog_staff_person_id",
+                ),
+                (
+                    catalog_m.Staff.objects.filter(person=person, role=role),
+                    "catalog_staff_person_role_id",
+                ),
+            ):
+                queryset = catalog_s.FilmographySerializer.setup_eager_loading(queryset)
+                plan = queryset.order_by("-id")[:21].explain()
+                self.assertIn(f"using {index} on", plan)
+                self.assertNotIn("Sort", plan)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
+                cursor.execute("RESET enable_sort")
+
+    def test_compressed_response_gzip(self):
+        response = self.client.get(
+            "/api/catalog/movie/?expand=movie_staff", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.content))["count"], 4)
+        # Random padding in the header, against BREACH.
+        self.assertTrue(response.content[3] & gzip.FNAME)
+
+    def test_html_response_not_compressed(self):
+        # The browsable API carries a CSRF token.
+        response = self.client.get(
+            "/api/catalog/movie/?expand=movie_staff",
+            HTTP_ACCEPT="text/html",
+            HTTP_ACCEPT_ENCODING="gzip, br",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_compressed_response_brotli(self):
+        response = self.client.get(
+            "/api/catalog/movie/?expand=movie_staff",
+            HTTP_ACCEPT_ENCODING="gzip, deflate, br",
+        )
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(json.loads(brotli.decompress(response.content))["count"], 4)
+
+    @override_settings(COMPRESSION_MIN_LENGTH=10**6)
+    def test_small_response_not_compressed(self):
+        response = self.client.get(
+            "/api/catalog/movie/?expand=movie_staff", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_search_movies(self):
+        response = self.client.get("/api/catalog/movie/?search=movie 3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.movies[2].pk)
+
+        response = self.client.get("/api/catalog/movie/?search=Test Movei")
+        self.assertEqual(response.data["count"], len(self.movies))
+
+    def test_search_persons(self):
+        response = self.client.get("/api/catalog/person/?search=name2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.persons[1].pk)
 
     def test_get_list_series(self):
         response = self.client.get("/api/catalog/series/")
@@ -221,10 +558,14 @@ class TestMovieVS(APITestCase):
         self.assertIsInstance(response.data, dict)
 
     def test_queries_series(self):
-        # 2 - select series with pagination
-        # 2 - select photo, videos
-        # 2 - select staff, genres
-        with self.assertNumQueries(6):
+        # 2 - select series with poster with pagination
+        # 1 - select genres into the cache
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/catalog/series/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # genre names are read from the cache
+        with self.assertNumQueries(2):
             response = self.client.get("/api/catalog/series/")
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -239,9 +580,507 @@ class TestMovieVS(APITestCase):
         self.assertIsInstance(response.data, dict)
 
     def test_queries_games(self):
-        # 2 - select game with pagination
-        # 2 - select photo, videos
-        # 1 - select genres
-        with self.assertNumQueries(5):
+        # 2 - select game with poster with pagination
+        # 1 - select genres into the cache
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/catalog/game/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # genre names are read from the cache
+        with self.assertNumQueries(2):
             response = self.client.get("/api/catalog/game/")
             self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestReadablePKRFChoices(APITestCase):
+    def setUp(self):
+        self.user = users_m.User.objects.create_user(
+            email="email@gmail.com", username="username", password="password"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.create_movies(10)
+
+    def create_movies(self, count):
+        start = catalog_m.Movie.objects.count()
+        catalog_m.Movie.objects.bulk_create(
+            catalog_m.Movie(title=f"Movie {i}", description=f"Movie {i}")
+            for i in range(start, start + count)
+        )
+
+    def get_browsable_api_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/catalog/movie_rating/?format=api")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return queries
+
+    def test_queries_browsable_api_choices(self):
+        queries_count = len(self.get_browsable_api_queries())
+
+        self.create_movies(500)
+        queries = self.get_browsable_api_queries()
+        self.assertEqual(len(queries), queries_count)
+        movie_table = catalog_m.Movie._meta.db_table
+        choices_queries = [
+            q["sql"] for q in queries if f'FROM "{movie_table}"' in q["sql"]
+        ]
+        self.assertTrue(choices_queries)
+        self.assertTrue(all("LIMIT" in sql for sql in choices_queries))
+
+    def test_choices_bounded(self):
+        self.create_movies(500)
+        field = catalog_s.MovieRatingSerializer().fields["movie"]
+        with self.assertNumQueries(1):
+            choices = field.get_choices()
+        self.assertEqual(len(choices), field.choices_limit)
+
+    def post_rating(self, movie):
+        response = self.client.post(
+            "/api/catalog/movie_rating/", data={"movie": movie.pk, "rating": 5}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_validation_looks_up_submitted_pk(self):
+        # The first request also loads the reference caches.
+        movies = catalog_m.Movie.objects.order_by("pk")
+        self.post_rating(movies[0])
+        with CaptureQueriesContext(connection) as queries:
+            self.post_rating(movies[1])
+
+        self.create_movies(500)
+        with self.assertNumQueries(len(queries)):
+            self.post_rating(catalog_m.Movie.objects.last())
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = {
+            "id": uuid.uuid4(),
+            "created_at": timezone.now(),
+            "release_date": date(2024, 8, 4),
+            "duration": timedelta(hours=2),
+            "rating": Decimal("7.25"),
+            "title": "Fight Club\u2028",
+            "results": [{1: "one"}],
+        }
+        expected = JSONRenderer().render(data)
+        rendered = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(rendered), json.loads(expected))
+        self.assertNotIn("\u2028".encode(), rendered)
+
+    def test_parser_roundtrip(self):
+        data = {"movie": 1, "rating": 5, "title": "Amélie"}
+        stream = BytesIO(FastJSONRenderer().render(data))
+        self.assertEqual(FastJSONParser().parse(stream), data)
+
+
+class TestSearchVS(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.movie = catalog_m.Movie.objects.create(
+            title="The Matrix", description="Neo"
+        )
+        catalog_m.Movie.objects.create(title="Inception", description="Dreams")
+        self.series = catalog_m.Series.objects.create(
+            title="The Matrix Animated", description="Anime"
+        )
+        self.game = catalog_m.Game.objects.create(
+            title="Enter the Matrix", description="Game"
+        )
+        self.person = catalog_m.Person.objects.create(name="Keanu Reeves")
+
+    def test_search(self):
+        # 1 - union of movies, series, games and persons
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/catalog/search/?q=matrix")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            response.data["movies"], [{"id": self.movie.pk, "title": "The Matrix"}]
+        )
+        self.assertEqual(response.data["series"][0]["id"], self.series.pk)
+        self.assertEqual(response.data["games"][0]["id"], self.game.pk)
+        self.assertEqual(response.data["persons"], [])
+
+    def test_search_prefix(self):
+        response = self.client.get("/api/catalog/search/?q=kea&mode=prefix")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["persons"][0]["id"], self.person.pk)
+
+        response = self.client.get(
+            "/api/catalog/search/?q=the matr&mode=prefix&limit=1"
+        )
+        self.assertEqual(len(response.data["movies"]), 1)
+        self.assertEqual(len(response.data["series"]), 1)
+        self.assertEqual(response.data["games"], [])
+
+    def test_search_requires_query(self):
+        response = self.client.get("/api/catalog/search/")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestSearchIndexes(APITestCase):
+    def setUp(self):
+        for i in range(1, 5):
+            title = f"The Matrix {i}"
+            catalog_m.Movie.objects.create(title=title, description="Neo")
+            catalog_m.Series.objects.create(title=title, description="Neo")
+            catalog_m.Game.objects.create(title=title, description="Neo")
+            catalog_m.Person.objects.create(name=f"Keanu Reeves {i}")
+
+        # Tiny tables are always scanned sequentially and sorted, so force the
+        # planner to show whether the search can use an index at all.
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("SET enable_sort = off")
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+            cursor.execute("RESET enable_sort")
+
+    def assertSearchUsesIndexes(self, queryset, indexes):
+        plan = queryset.explain()
+        self.assertNotIn("Seq Scan", plan)
+        for index in indexes:
+            self.assertIn(index, plan)
+
+    def test_media_search_uses_gin_indexes(self):
+        for model in (catalog_m.Movie, catalog_m.Series, catalog_m.Game):
+            name = model._meta.model_name
+            self.assertSearchUsesIndexes(
+                search(model.objects.all(), "matrix", "title"),
+                [f"catalog_{name}_search_gin", f"catalog_{name}_title_trgm"],
+            )
+
+    def test_person_search_uses_gin_indexes(self):
+        self.assertSearchUsesIndexes(
+            search(catalog_m.Person.objects.all(), "keanu", "name", config="simple"),
+            ["catalog_person_search_gin", "catalog_person_name_trgm"],
+        )
+
+    def test_prefix_search_reads_top_matches_from_index(self):
+        for model, field in (
+            (catalog_m.Movie, "title"),
+            (catalog_m.Series, "title"),
+            (catalog_m.Game, "title"),
+            (catalog_m.Person, "name"),
+        ):
+            name = model._meta.model_name
+            queryset = prefix_search(model.objects.all(), "the ma", field)[:5]
+            plan = queryset.explain()
+            self.assertIn(f"catalog_{name}_{field}_prefix", plan)
+            self.assertNotIn("Sort", plan)
+
+    def test_title_icontains_uses_trigram_index(self):
+        self.assertSearchUsesIndexes(
+            catalog_m.Movie.objects.filter(title__icontains="atri"),
+            ["catalog_movie_title_trgm"],
+        )
+
+
+class TestReleaseYearFilters(APITestCase):
+    FIXTURE_SIZE = 5000
+
+    def setUp(self):
+        # A century of releases, large enough for the planner to prefer the
+        # (release_date, id) index over a sequential scan for a single year.
+        self.filters = (
+            (catalog_m.Movie, catalog_f.MovieFilter),
+            (catalog_m.Series, catalog_f.SeriesFilter),
+            (catalog_m.Game, catalog_f.GameFilter),
+        )
+        for model, _ in self.filters:
+            model.objects.bulk_create(
+                model(
+                    title=f"Title {i}",
+                    description="Description",
+                    release_date=date(1925 + i % 100, 1 + i % 12, 1 + i % 28),
+                )
+                for i in range(self.FIXTURE_SIZE)
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def filter(self, filterset_class, model, **data):
+        filterset = filterset_class(data, queryset=model.objects.all())
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        return filterset.qs
+
+    def test_year_filters(self):
+        movies = self.filter(catalog_f.MovieFilter, catalog_m.Movie, release_date=1999)
+        self.assertEqual(movies.count(), self.FIXTURE_SIZE // 100)
+        self.assertTrue(all(m.release_date.year == 1999 for m in movies))
+
+        movies = self.filter(
+            catalog_f.MovieFilter,
+            catalog_m.Movie,
+            release_date__gte=2000,
+            release_date__lte=2001,
+        )
+        self.assertEqual(movies.count(), self.FIXTURE_SIZE // 50)
+        self.assertEqual(
+            {m.release_date.year for m in movies},
+            {2000, 2001},
+        )
+
+    def test_year_filter_validation(self):
+        response = self.client.get("/api/catalog/movie/?release_date=0")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_year_filters_use_release_index(self):
+        for model, filterset_class in self.filters:
+            name = model._meta.model_name
+            for data in (
+                {"release_date": 1999},
+                {"release_date__gte": 2023},
+                {"release_date__gte": 1999, "release_date__lte": 2000},
+            ):
+                with self.subTest(model=name, data=data):
+                    plan = self.filter(filterset_class, model, **data).explain()
+                    self.assertNotIn("Seq Scan", plan)
+                    self.assertNotIn("EXTRACT", plan.upper())
+                    self.assertIn(f"catalog_{name}_release_idx", plan)
+
+
+class TestGenreIds(APITestCase):
+    def setUp(self):
+        self.genres = [
+            catalog_m.MediaGenre.objects.create(name=f"genre{i}") for i in range(3)
+        ]
+        self.movie = catalog_m.Movie.objects.create(title="Movie", description="")
+
+    def assertGenreIds(self, genres):
+        self.movie.refresh_from_db(fields=["genre_ids"])
+        self.assertEqual(self.movie.genre_ids, sorted(genre.pk for genre in genres))
+
+    def test_genre_ids_follow_genres(self):
+        self.movie.genres.set(self.genres[:2])
+        self.assertEqual(self.movie.genre_ids, [g.pk for g in self.genres[:2]])
+        self.assertGenreIds(self.genres[:2])
+
+        self.movie.genres.remove(self.genres[0])
+        self.assertGenreIds(self.genres[1:2])
+
+        self.genres[2].movies.add(self.movie)
+        self.assertGenreIds(self.genres[1:])
+
+        self.genres[1].movies.clear()
+        self.assertGenreIds(self.genres[2:])
+
+        self.genres[2].delete()
+        self.assertGenreIds([])
+
+    def test_importer_refreshes_genre_ids(self):
+        self.movie.imdb_id = "tt1"
+        self.movie.save()
+        self.movie.genres.set(self.genres[:2])
+
+        catalog_imdb.update_or_create_movies(
+            [
+                {
+                    "imdb_id": "tt1",
+                    "title": "Movie",
+                    "duration": None,
+                    "genres": ["genre2", "new genre"],
+                    "staff": [],
+                },
+                {
+                    "imdb_id": "tt2",
+                    "title": "Other movie",
+                    "duration": None,
+                    "genres": ["genre0"],
+                    "staff": [],
+                },
+            ]
+        )
+
+        new_genre = catalog_m.MediaGenre.objects.get(name="new genre")
+        self.assertGenreIds([self.genres[2], new_genre])
+        other = catalog_m.Movie.objects.get(imdb_id="tt2")
+        self.assertEqual(other.genre_ids, [self.genres[0].pk])
+        self.assertEqual(list(other.genres.all()), [self.genres[0]])
+
+    def test_genre_filter_uses_gin_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+        try:
+            for model, filterset_class in (
+                (catalog_m.Movie, catalog_f.MovieFilter),
+                (catalog_m.Series, catalog_f.SeriesFilter),
+                (catalog_m.Game, catalog_f.GameFilter),
+            ):
+                filterset = filterset_class(
+                    {"genres": [genre.pk for genre in self.genres]},
+                    queryset=model.objects.all(),
+                )
+                self.assertTrue(filterset.is_valid(), filterset.errors)
+                plan = filterset.qs.explain()
+                self.assertIn(f"catalog_{model._meta.model_name}_genre_ids_gin", plan)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
+
+
+class TestReferenceCache(APITestCase):
+    def setUp(self):
+        self.genre = catalog_m.MediaGenre.objects.create(name="genre")
+        # Two copies of the same cache stand in for two worker processes.
+        self.process_a = ReferenceCache("catalog.MediaGenre")
+        self.process_b = ReferenceCache("catalog.MediaGenre")
+
+    def test_reads_are_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.process_a.get(self.genre.pk), self.genre)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.process_a.get_many([self.genre.pk]), [self.genre])
+
+        # Unknown ids only check the shared version.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.process_a.get_many([self.genre.pk, 0]), [self.genre])
+            self.assertIsNone(self.process_a.get(0))
+
+    def test_unknown_ids_see_committed_writes(self):
+        self.process_a.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            genre = catalog_m.MediaGenre.objects.create(name="new genre")
+            self.process_b.invalidate()
+
+        # Within the check interval, but the missing id checks the version.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.process_a.get(genre.pk), genre)
+
+    @override_settings(REFERENCE_CACHE_CHECK_INTERVAL=0)
+    def test_invalidated_through_shared_version(self):
+        self.process_a.all()
+        self.process_b.all()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genre.name = "renamed"
+            self.genre.save()
+            self.process_a.invalidate()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.process_b.get(self.genre.pk).name, "renamed")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.process_a.get(self.genre.pk).name, "renamed")
+
+    def test_version_checked_once_per_interval(self):
+        self.process_b.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.process_a.invalidate()
+
+        with self.assertNumQueries(0):
+            self.process_b.get(self.genre.pk)
+
+
+@override_settings(CATALOG_READ_MODEL=True, MEDIA_ROOT=TEMP_MEDIA)
+class TestMediaDocuments(APITestCase):
+    def setUp(self):
+        # Refreshes run in the worker; here they run when queued.
+        patcher = mock.patch.object(
+            catalog_t.refresh_catalog_documents,
+            "delay",
+            side_effect=catalog_t.refresh_catalog_documents,
+        )
+        self.refresh_documents = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = users_m.User.objects.create_user(
+            email="email@gmail.com", username="username", password="password"
+        )
+        self.genres = [
+            catalog_m.MediaGenre.objects.create(name=f"genre{i}") for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movies = []
+            for i in range(3):
+                movie = catalog_m.Movie.objects.create(
+                    title=f"Movie {i}",
+                    description="Description",
+                    release_date=date(2020 + i, 1, 1),
+                )
+                movie.genres.set(self.genres[: i + 1])
+                self.movies.append(movie)
+            catalog_m.MovieRating.objects.create(
+                movie=self.movies[0], user=self.user, rating=7
+            )
+
+    def get_movies(self, query=""):
+        response = self.client.get(f"/api/catalog/movie/?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {movie["id"]: movie for movie in response.data["results"]}
+
+    def test_list_from_documents(self):
+        # 2 - select movie documents with pagination
+        with self.assertNumQueries(2):
+            movies = self.get_movies()
+
+        with override_settings(CATALOG_READ_MODEL=False):
+            self.assertEqual(movies, self.get_movies())
+        self.assertEqual(movies[self.movies[0].pk]["rating"], 7.0)
+
+    def test_list_from_documents_filtered(self):
+        movies = self.get_movies(f"genres={self.genres[2].pk}&release_date__gte=2021")
+        self.assertEqual(set(movies), {self.movies[2].pk})
+
+    def test_documents_follow_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movies[1].title = "Renamed"
+            self.movies[1].save()
+            self.movies[1].genres.remove(self.genres[0])
+            catalog_m.MovieRating.objects.create(
+                movie=self.movies[1], user=self.user, rating=3
+            )
+
+        movie = self.get_movies()[self.movies[1].pk]
+        self.assertEqual(movie["title"], "Renamed")
+        self.assertEqual(movie["genres"], [self.genres[1].pk])
+        self.assertEqual(movie["rating"], 3.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genres[1].name = "renamed"
+            self.genres[1].save()
+
+        movie = self.get_movies()[self.movies[1].pk]
+        self.assertEqual(movie["genre_names"], ["renamed"])
+
+    def test_documents_drop_deleted_genre(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genres[0].delete()
+
+        movies = self.get_movies()
+        for movie in self.movies:
+            self.assertEqual(
+                movies[movie.pk]["genres"],
+                list(movie.genres.order_by("pk").values_list("pk", flat=True)),
+            )
+        with override_settings(CATALOG_READ_MODEL=False):
+            self.assertEqual(movies, self.get_movies())
+
+    def test_documents_drop_deleted_poster(self):
+        movie = self.movies[0]
+        with open("medialibrary/utils/test_data/photo.png", "rb") as f:
+            poster = common_m.Photo.objects.create(
+                photo=File(f), type=common_c.PHOTO_TYPE_POSTER
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            movie.poster = poster
+            movie.save()
+        self.assertIsNotNone(self.get_movies()[movie.pk]["poster"])
+
+        self.refresh_documents.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            poster.delete()
+        self.refresh_documents.assert_called_once_with("catalog.Movie", [movie.pk])
+        self.assertIsNone(self.get_movies()[movie.pk]["poster"])
+
+    def test_missing_documents_fall_back_to_orm(self):
+        catalog_m.MovieDocument.objects.filter(movie=self.movies[0]).delete()
+        movies = self.get_movies()
+        self.assertEqual(movies[self.movies[0].pk]["title"], "Movie 0")
+
+    def test_rebuild_command(self):
+        catalog_m.MovieDocument.objects.all().delete()
+        call_command("rebuild_catalog_documents", "--model=movie", stdout=StringIO())
+        self.assertEqual(catalog_m.MovieDocument.objects.count(), len(self.movies))
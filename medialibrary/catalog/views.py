@@ -1,14 +1,30 @@
-from django.db.models import Avg, Prefetch
-from django.db.models.functions import Coalesce, Round
-from rest_framework import mixins, permissions
-from rest_framework.exceptions import APIException
+from django.conf import settings
+from django.db.models import Prefetch
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
 from rest_framework.routers import DefaultRouter
 
+import medialibrary.catalog.constants as catalog_c
+import medialibrary.catalog.documents as catalog_d
 import medialibrary.catalog.filters as catalog_f
 import medialibrary.catalog.models as catalog_m
 import medialibrary.catalog.serializers as catalog_s
 import medialibrary.common.models as common_m
-from medialibrary.utils.base_views import BaseViewSet
+import medialibrary.common.serializers as common_s
+from medialibrary.catalog.docs import search_extend_schema
+from medialibrary.catalog.search import search_all
+from medialibrary.utils.base_views import (
+    ActionBasedPermission,
+    BaseViewSet,
+    BulkRetrieveMixin,
+    DynamicCursorPagination,
+    DynamicFieldsQuerysetMixin,
+)
 
 
 class MediaGenreVS(BaseViewSet):
@@ -21,46 +37,162 @@ class MediaGenreVS(BaseViewSet):
     }
 
 
-class PersonVS(BaseViewSet):
-    queryset = catalog_m.Person.objects.all()
+class PersonVS(BulkRetrieveMixin, BaseViewSet):
+    queryset = catalog_m.Person.objects.defer("search_vector")
     serializer_class = catalog_s.PersonSerializer
     filterset_class = catalog_f.PersonFilter
 
     action_permissions = {
         "list": permissions.AllowAny,
         "retrieve": permissions.AllowAny,
+        "bulk": permissions.AllowAny,
+        "filmography": permissions.AllowAny,
     }
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "role", OpenApiTypes.INT, description="Only credits with this role"
+            )
+        ],
+        responses=catalog_s.FilmographySerializer(many=True),
+    )
+    @action(
+        detail=True,
+        serializer_class=catalog_s.FilmographySerializer,
+        pagination_class=DynamicCursorPagination,
+        filter_backends=[],
+    )
+    def filmography(self, request, pk=None):
+        """
+        Movie and series credits of a person, latest added first. Cursor paginated,
+        so prolific people page in constant time.
+        """
+        person = get_object_or_404(catalog_m.Person.objects.only("id"), pk=pk)
+        queryset = catalog_m.Staff.objects.filter(person=person)
+        role = request.query_params.get("role")
+        if role:
+            if not role.isdigit():
+                raise ValidationError({"role": "A valid integer is required."})
+            queryset = queryset.filter(role=role)
+        queryset = catalog_s.FilmographySerializer.setup_eager_loading(queryset)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class MediaContentVS(BulkRetrieveMixin, DynamicFieldsQuerysetMixin, BaseViewSet):
+    """
+    The list action renders `list_serializer_class` from a minimal queryset,
+    unless the client asks for a custom payload with `?fields=` / `?expand=`.
+    With `CATALOG_READ_MODEL` enabled that payload is read from the
+    precomputed documents instead.
+    """
+
+    list_serializer_class = None
+
+    def is_compact_list(self):
+        return self.action == "list" and not self.is_sparse_request()
+
+    def use_read_model(self):
+        return settings.CATALOG_READ_MODEL and self.is_compact_list()
+
+    def get_serializer_class(self):
+        if self.is_compact_list():
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        qs = super().get_queryset().defer("search_vector")
+        if self.use_read_model():
+            return qs.select_related("document").only("id", "document__data")
+
+        if self.is_field_requested("rating"):
+            qs = qs.annotate(rating=catalog_m.media_rating())
+
+        if self.is_compact_list():
+            return self.list_serializer_class.setup_eager_loading(qs)
+        return self.optimize_queryset(qs)
+
+    def get_documents(self, items):
+        # Items written before the read model was built are rendered from the
+        # ORM until the next rebuild.
+        model = self.queryset.model
+        missing = [item.pk for item in items if not hasattr(item, "document")]
+        fallback = {}
+        if missing:
+            fallback = catalog_d.build_documents(
+                model, catalog_d.get_document_queryset(model).filter(pk__in=missing)
+            )
 
-class MovieVS(BaseViewSet):
+        documents = []
+        for item in items:
+            if item.pk in fallback:
+                data = dict(fallback[item.pk])
+            else:
+                data = dict(item.document.data)
+            if data.get("poster"):
+                data["poster"] = self.request.build_absolute_uri(data["poster"])
+            if data.get("poster_srcset"):
+                data["poster_srcset"] = common_s.absolute_srcset(
+                    self.request, data["poster_srcset"]
+                )
+            documents.append(data)
+        return documents
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_read_model():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_documents(page))
+        return Response(self.get_documents(list(queryset)))
+
+
+class MediaStaffMixin:
+    """
+    Adds a paginated `staff` action listing all staff of an item by billing,
+    as detail payloads only embed the top billed entries.
+    """
+
+    @extend_schema(responses=catalog_s.StaffSerializer(many=True))
+    @action(detail=True, serializer_class=catalog_s.StaffSerializer, filter_backends=[])
+    def staff(self, request, pk=None):
+        model = self.queryset.model
+        item = get_object_or_404(model.objects.only("id"), pk=pk)
+        queryset = catalog_m.Staff.objects.filter(
+            **{model._meta.model_name: item}
+        ).select_related("person")
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class MovieVS(MediaStaffMixin, MediaContentVS):
     queryset = catalog_m.Movie.objects.all()
     serializer_class = catalog_s.MovieSerializer
+    list_serializer_class = catalog_s.MovieListSerializer
     filterset_class = catalog_f.MovieFilter
 
+    select_related_fields = ("poster",)
+    prefetch_related_fields = {
+        "photos": "photos",
+        "videos": Prefetch(
+            "videos",
+            queryset=common_m.Video.objects.all().select_related("preview"),
+        ),
+        "movie_staff": catalog_s.TopBilledStaffListSerializer.prefetch("movie_staff"),
+    }
+
     action_permissions = {
         "list": permissions.AllowAny,
         "retrieve": permissions.AllowAny,
+        "bulk": permissions.AllowAny,
+        "staff": permissions.AllowAny,
     }
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        return (
-            qs.annotate(rating=Coalesce(Round(Avg("ratings__rating"), 2), 0.0))
-            .select_related("poster", "company")
-            .prefetch_related(
-                "photos",
-                "genres",
-                Prefetch(
-                    "videos",
-                    queryset=common_m.Video.objects.all().select_related("preview"),
-                ),
-                Prefetch(
-                    "movie_staff",
-                    queryset=catalog_m.Staff.objects.all().select_related("person"),
-                ),
-            )
-        )
-
 
 class MovieRatingVS(
     mixins.UpdateModelMixin,
@@ -78,22 +210,27 @@ class MovieRatingVS(
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            return qs.prefetch_related(
+                Prefetch(
+                    "movie",
+                    queryset=catalog_s.MovieListSerializer.setup_eager_loading(
+                        catalog_m.Movie.objects.all()
+                    ),
+                )
+            )
         return qs.prefetch_related(
             Prefetch(
                 "movie",
                 queryset=catalog_m.Movie.objects.all()
-                .select_related("poster", "company")
+                .select_related("poster")
                 .prefetch_related(
                     "photos",
-                    "genres",
                     Prefetch(
                         "videos",
                         queryset=common_m.Video.objects.all().select_related("preview"),
                     ),
-                    Prefetch(
-                        "movie_staff",
-                        queryset=catalog_m.Staff.objects.all().select_related("person"),
-                    ),
+                    catalog_s.TopBilledStaffListSerializer.prefetch("movie_staff"),
                 ),
             ),
         )
@@ -116,35 +253,29 @@ class MovieRatingVS(
         instance.delete()
 
 
-class SeriesVS(BaseViewSet):
+class SeriesVS(MediaStaffMixin, MediaContentVS):
     queryset = catalog_m.Series.objects.all()
     serializer_class = catalog_s.SeriesSerializer
+    list_serializer_class = catalog_s.SeriesListSerializer
     filterset_class = catalog_f.SeriesFilter
 
+    select_related_fields = ("poster",)
+    prefetch_related_fields = {
+        "photos": "photos",
+        "videos": Prefetch(
+            "videos",
+            queryset=common_m.Video.objects.all().select_related("preview"),
+        ),
+        "series_staff": catalog_s.TopBilledStaffListSerializer.prefetch("series_staff"),
+    }
+
     action_permissions = {
         "list": permissions.AllowAny,
         "retrieve": permissions.AllowAny,
+        "bulk": permissions.AllowAny,
+        "staff": permissions.AllowAny,
     }
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        return (
-            qs.annotate(rating=Coalesce(Round(Avg("ratings__rating"), 2), 0.0))
-            .select_related("poster", "company")
-            .prefetch_related(
-                "photos",
-                "genres",
-                Prefetch(
-                    "videos",
-                    queryset=common_m.Video.objects.all().select_related("preview"),
-                ),
-                Prefetch(
-                    "series_staff",
-                    queryset=catalog_m.Staff.objects.all().select_related("person"),
-                ),
-            )
-        )
-
 
 class SeriesRatingVS(
     mixins.UpdateModelMixin,
@@ -162,22 +293,27 @@ class SeriesRatingVS(
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            return qs.prefetch_related(
+                Prefetch(
+                    "series",
+                    queryset=catalog_s.SeriesListSerializer.setup_eager_loading(
+                        catalog_m.Series.objects.all()
+                    ),
+                )
+            )
         return qs.prefetch_related(
             Prefetch(
                 "series",
                 queryset=catalog_m.Series.objects.all()
-                .select_related("poster", "company")
+                .select_related("poster")
                 .prefetch_related(
                     "photos",
-                    "genres",
                     Prefetch(
                         "videos",
                         queryset=common_m.Video.objects.all().select_related("preview"),
                     ),
-                    Prefetch(
-                        "series_staff",
-                        queryset=catalog_m.Staff.objects.all().select_related("person"),
-                    ),
+                    catalog_s.TopBilledStaffListSerializer.prefetch("series_staff"),
                 ),
             ),
         )
@@ -210,31 +346,27 @@ class CompanyVS(BaseViewSet):
     }
 
 
-class GameVS(BaseViewSet):
+class GameVS(MediaContentVS):
     queryset = catalog_m.Game.objects.all()
     serializer_class = catalog_s.GameSerializer
+    list_serializer_class = catalog_s.GameListSerializer
     filterset_class = catalog_f.GameFilter
 
+    select_related_fields = ("poster",)
+    prefetch_related_fields = {
+        "photos": "photos",
+        "videos": Prefetch(
+            "videos",
+            queryset=common_m.Video.objects.all().select_related("preview"),
+        ),
+    }
+
     action_permissions = {
         "list": permissions.AllowAny,
         "retrieve": permissions.AllowAny,
+        "bulk": permissions.AllowAny,
     }
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        return (
-            qs.annotate(rating=Coalesce(Round(Avg("ratings__rating"), 2), 0.0))
-            .select_related("poster", "company")
-            .prefetch_related(
-                "photos",
-                "genres",
-                Prefetch(
-                    "videos",
-                    queryset=common_m.Video.objects.all().select_related("preview"),
-                ),
-            )
-        )
-
 
 class GameRatingVS(
     mixins.UpdateModelMixin,
@@ -252,14 +384,22 @@ class GameRatingVS(
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            return qs.prefetch_related(
+                Prefetch(
+                    "game",
+                    queryset=catalog_s.GameListSerializer.setup_eager_loading(
+                        catalog_m.Game.objects.all()
+                    ),
+                )
+            )
         return qs.prefetch_related(
             Prefetch(
                 "game",
                 queryset=catalog_m.Game.objects.all()
-                .select_related("poster", "company")
+                .select_related("poster")
                 .prefetch_related(
                     "photos",
-                    "genres",
                     Prefetch(
                         "videos",
                         queryset=common_m.Video.objects.all().select_related("preview"),
@@ -286,6 +426,26 @@ class GameRatingVS(
         instance.delete()
 
 
+class SearchVS(viewsets.GenericViewSet):
+    permission_classes = [ActionBasedPermission]
+    serializer_class = catalog_s.SearchQuerySerializer
+
+    action_permissions = {
+        "list": permissions.AllowAny,
+    }
+
+    @search_extend_schema
+    def list(self, request):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        results = search_all(
+            serializer.validated_data["q"],
+            serializer.validated_data["limit"],
+            prefix=serializer.validated_data["mode"] == catalog_c.SEARCH_MODE_PREFIX,
+        )
+        return Response(results)
+
+
 router = DefaultRouter()
 router.register("media_genre", MediaGenreVS)
 router.register("person", PersonVS)
@@ -296,5 +456,6 @@ router.register("series", SeriesVS)
 router.register("series_rating", SeriesRatingVS)
 router.register("game", GameVS)
 router.register("game_rating", GameRatingVS)
+router.register("search", SearchVS, basename="search")
 
 catalog_urls = router.urls
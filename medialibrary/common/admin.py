@@ -11,5 +11,35 @@ class PhotoAdmin(admin.ModelAdmin):
 
 @admin.register(common_m.Video)
 class VideoAdmin(admin.ModelAdmin):
-    list_display = ["id", "type", "movie", "series", "game", "created_at"]
-    readonly_fields = ["created_at", "updated_at"]
+    list_display = [
+        "id",
+        "type",
+        "movie",
+        "series",
+        "game",
+        "preview_status",
+        "hls_status",
+        "created_at",
+    ]
+    list_filter = ["preview_status", "hls_status"]
+    readonly_fields = [
+        "preview_status",
+        "hls_status",
+        "hls_playlist",
+        "created_at",
+        "updated_at",
+    ]
+
+
+@admin.register(common_m.Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ["id", "name", "size", "ref_count", "created_at"]
+    search_fields = ["sha256", "name"]
+    readonly_fields = [
+        "sha256",
+        "name",
+        "size",
+        "ref_count",
+        "created_at",
+        "updated_at",
+    ]
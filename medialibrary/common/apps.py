@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
 
 
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "medialibrary.common"
+
+    def ready(self):
+        import medialibrary.common.models as common_m
+
+        for model in (common_m.Photo, common_m.Video):
+            post_delete.connect(
+                common_m.release_blob,
+                sender=model,
+                dispatch_uid=f"release_blob_{model._meta.model_name}",
+            )
+        post_delete.connect(
+            common_m.delete_hls,
+            sender=common_m.Video,
+            dispatch_uid="delete_hls_video",
+        )
@@ -14,6 +14,70 @@ PHOTO_TYPES = (
     (PHOTO_TYPE_VIDEO_PREVIEW, "Video Preview"),
 )
 
+PHOTO_VARIANT_WIDTHS = (
+    ("thumb", 160),
+    ("card", 480),
+    ("full", 1280),
+)
+
+# Extension, Pillow format and save options. Formats the installed Pillow
+# can't encode are skipped.
+PHOTO_VARIANT_FORMATS = (
+    ("avif", "AVIF", {"quality": 50}),
+    ("webp", "WEBP", {"quality": 80}),
+    ("jpg", "JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+)
+
 VIDEO_TYPE_TRAILER = 3
 
 VIDEO_TYPES = ((VIDEO_TYPE_TRAILER, "Trailer"),)
+
+PREVIEW_STATUS_PENDING = 3
+PREVIEW_STATUS_PROCESSING = 6
+PREVIEW_STATUS_READY = 9
+PREVIEW_STATUS_FAILED = 12
+
+PREVIEW_STATUSES = (
+    (PREVIEW_STATUS_PENDING, "Pending"),
+    (PREVIEW_STATUS_PROCESSING, "Processing"),
+    (PREVIEW_STATUS_READY, "Ready"),
+    (PREVIEW_STATUS_FAILED, "Failed"),
+)
+
+HLS_STATUS_PENDING = 3
+HLS_STATUS_PROCESSING = 6
+HLS_STATUS_READY = 9
+HLS_STATUS_FAILED = 12
+
+HLS_STATUSES = (
+    (HLS_STATUS_PENDING, "Pending"),
+    (HLS_STATUS_PROCESSING, "Processing"),
+    (HLS_STATUS_READY, "Ready"),
+    (HLS_STATUS_FAILED, "Failed"),
+)
+
+# The adaptive bitrate ladder, by the shorter side of the frame so portrait
+# videos get the same steps. Bitrates in kbit/s.
+HLS_RENDITIONS = (
+    {"name": "360p", "height": 360, "video_bitrate": 800, "audio_bitrate": 96},
+    {"name": "720p", "height": 720, "video_bitrate": 2800, "audio_bitrate": 128},
+    {"name": "1080p", "height": 1080, "video_bitrate": 5000, "audio_bitrate": 192},
+)
+HLS_SEGMENT_SECONDS = 6
+HLS_MASTER_PLAYLIST = "master.m3u8"
+
+VIDEO_UPLOAD_STATUS_UPLOADING = 3
+VIDEO_UPLOAD_STATUS_QUEUED = 6
+VIDEO_UPLOAD_STATUS_PROCESSING = 9
+VIDEO_UPLOAD_STATUS_COMPLETE = 12
+VIDEO_UPLOAD_STATUS_FAILED = 15
+
+VIDEO_UPLOAD_STATUSES = (
+    (VIDEO_UPLOAD_STATUS_UPLOADING, "Uploading"),
+    (VIDEO_UPLOAD_STATUS_QUEUED, "Queued"),
+    (VIDEO_UPLOAD_STATUS_PROCESSING, "Processing"),
+    (VIDEO_UPLOAD_STATUS_COMPLETE, "Complete"),
+    (VIDEO_UPLOAD_STATUS_FAILED, "Failed"),
+)
+
+VIDEO_CHUNK_SIZE = 1024 * 1024
@@ -0,0 +1,109 @@
+import base64
+from io import BytesIO
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image
+
+# Leading bytes of the video containers accepted, by offset. QuickTime files
+# may start with other atoms than `ftyp`.
+VIDEO_SIGNATURES = (
+    (4, b"ftyp"),
+    (4, b"moov"),
+    (4, b"mdat"),
+    (4, b"wide"),
+    (4, b"free"),
+    (0, b"\x1a\x45\xdf\xa3"),  # Matroska and WebM
+    (8, b"AVI "),
+)
+
+
+def get_storage():
+    """
+    Returns the default storage if clients can upload to it directly, that is
+    if it's an S3 bucket.
+    """
+    if hasattr(default_storage, "bucket"):
+        return default_storage
+    return None
+
+
+def get_checksum(sha256):
+    # S3 reports SHA-256 checksums base64 encoded.
+    return base64.b64encode(bytes.fromhex(sha256)).decode()
+
+
+def presign_put(storage, name, size, sha256):
+    """
+    Returns a presigned URL for a single `PUT` of the object and the headers
+    the client must send with it. S3 rejects a body of another size or with
+    another SHA-256 checksum.
+    """
+    headers = {
+        "x-amz-checksum-sha256": get_checksum(sha256),
+        "x-amz-sdk-checksum-algorithm": "SHA256",
+    }
+    params = {
+        "Bucket": storage.bucket_name,
+        "Key": storage._normalize_name(name),
+        "ContentLength": size,
+        "ChecksumSHA256": headers["x-amz-checksum-sha256"],
+        "ChecksumAlgorithm": "SHA256",
+    }
+    if storage.default_acl:
+        params["ACL"] = headers["x-amz-acl"] = storage.default_acl
+    cache_control = storage.object_parameters.get("CacheControl")
+    if cache_control:
+        params["CacheControl"] = headers["Cache-Control"] = cache_control
+
+    url = storage.bucket.meta.client.generate_presigned_url(
+        "put_object", Params=params, ExpiresIn=settings.DIRECT_UPLOAD_EXPIRATION
+    )
+    return url, headers
+
+
+def head_object(storage, name):
+    """
+    Returns the size and SHA-256 checksum of an uploaded object, or None if
+    there is no such object.
+    """
+    try:
+        response = storage.bucket.meta.client.head_object(
+            Bucket=storage.bucket_name,
+            Key=storage._normalize_name(name),
+            ChecksumMode="ENABLED",
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return response["ContentLength"], response.get("ChecksumSHA256")
+
+
+def read_object(storage, name, length=None):
+    params = {"Bucket": storage.bucket_name, "Key": storage._normalize_name(name)}
+    if length is not None:
+        params["Range"] = f"bytes=0-{length - 1}"
+    return storage.bucket.meta.client.get_object(**params)["Body"].read()
+
+
+def has_valid_content(storage, name, kind):
+    """
+    Checks that an uploaded object is an image or a video, as `kind` says.
+    Images are read whole, within `PHOTO_UPLOAD_MAX_SIZE`, and checked by
+    Pillow. Of videos only the leading bytes are read, for the container
+    signature.
+    """
+    if kind == "photo":
+        try:
+            with Image.open(BytesIO(read_object(storage, name))) as image:
+                image.verify()
+        except Exception:
+            return False
+        return True
+
+    head = read_object(storage, name, 16)
+    return any(
+        head.startswith(signature, offset) for offset, signature in VIDEO_SIGNATURES
+    )
@@ -0,0 +1,142 @@
+import os
+import posixpath
+import subprocess
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+import medialibrary.common.constants as common_c
+
+
+def get_even(value):
+    # libx264 requires even frame dimensions.
+    return max(2, round(value / 2) * 2)
+
+
+def get_renditions(width, height):
+    """
+    Returns the steps of the ladder a `width` x `height` video is transcoded
+    to, with their frame sizes. Videos are never upscaled, those smaller than
+    the lowest step get it at their own size.
+    """
+    short_side = min(width, height)
+    renditions = [
+        rendition
+        for rendition in common_c.HLS_RENDITIONS
+        if rendition["height"] <= short_side
+    ] or [
+        {**common_c.HLS_RENDITIONS[0], "name": f"{short_side}p", "height": short_side}
+    ]
+
+    return [
+        {
+            **rendition,
+            "size": (
+                get_even(width * rendition["height"] / short_side),
+                get_even(height * rendition["height"] / short_side),
+            ),
+        }
+        for rendition in renditions
+    ]
+
+
+def get_command(source, output, renditions, has_audio):
+    """
+    Returns the ffmpeg command encoding all `renditions` of `source` into
+    `output` in one pass, so the source is decoded only once. Keyframes are
+    forced at segment boundaries so players can switch renditions between
+    any two segments.
+    """
+    count = len(renditions)
+    filters = [f"[0:v]split={count}" + "".join(f"[v{i}]" for i in range(count))]
+    command = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-loglevel", "error"]
+    command += ["-y", "-i", source, "-threads", str(settings.VIDEO_TRANSCODE_THREADS)]
+
+    outputs = []
+    streams = []
+    for i, rendition in enumerate(renditions):
+        width, height = rendition["size"]
+        filters.append(f"[v{i}]scale={width}:{height}[v{i}out]")
+        bitrate = rendition["video_bitrate"]
+        outputs += ["-map", f"[v{i}out]", f"-c:v:{i}", "libx264"]
+        outputs += [f"-b:v:{i}", f"{bitrate}k", f"-maxrate:v:{i}", f"{bitrate}k"]
+        outputs += [f"-bufsize:v:{i}", f"{bitrate * 2}k"]
+        stream = f"v:{i}"
+        if has_audio:
+            outputs += ["-map", "0:a:0", f"-c:a:{i}", "aac"]
+            outputs += [f"-b:a:{i}", f"{rendition['audio_bitrate']}k"]
+            stream += f",a:{i}"
+        streams.append(f"{stream},name:{rendition['name']}")
+
+    command += ["-filter_complex", ";".join(filters), *outputs]
+    command += ["-preset", settings.VIDEO_TRANSCODE_PRESET, "-pix_fmt", "yuv420p"]
+    if has_audio:
+        command += ["-ac", "2"]
+    seconds = common_c.HLS_SEGMENT_SECONDS
+    command += ["-force_key_frames", f"expr:gte(t,n_forced*{seconds})"]
+    command += ["-f", "hls", "-hls_time", str(seconds)]
+    command += ["-hls_playlist_type", "vod", "-hls_flags", "independent_segments"]
+    command += ["-hls_segment_filename", os.path.join(output, "%v", "%05d.ts")]
+    command += ["-master_pl_name", common_c.HLS_MASTER_PLAYLIST]
+    command += ["-var_stream_map", " ".join(streams)]
+    command += [os.path.join(output, "%v", "index.m3u8")]
+    return command
+
+
+def transcode(source, output):
+    """
+    Transcodes the video file at `source` to HLS renditions in the `output`
+    directory, with the master playlist at its root.
+    """
+    infos = ffmpeg_parse_infos(source)
+    width, height = infos["video_size"]
+    if infos.get("video_rotation") in (90, 270):
+        # ffmpeg applies the rotation, so the frames come out turned.
+        width, height = height, width
+
+    renditions = get_renditions(width, height)
+    command = get_command(source, output, renditions, infos["audio_found"])
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.decode(errors="replace").strip())
+
+
+def save(output, prefix):
+    """
+    Stores the files in the `output` directory under `prefix` and returns
+    the name of the master playlist.
+    """
+    saved = []
+    try:
+        for root, _, filenames in os.walk(output):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                parts = os.path.relpath(path, output).split(os.sep)
+                with open(path, "rb") as f:
+                    saved.append(
+                        default_storage.save(posixpath.join(prefix, *parts), File(f))
+                    )
+    except Exception:
+        for name in saved:
+            default_storage.delete(name)
+        raise
+    return posixpath.join(prefix, common_c.HLS_MASTER_PLAYLIST)
+
+
+def delete(playlist):
+    """
+    Deletes the master playlist `playlist` with its renditions.
+    """
+    directories = [posixpath.dirname(playlist)]
+    while directories:
+        directory = directories.pop()
+        try:
+            subdirectories, filenames = default_storage.listdir(directory)
+        except FileNotFoundError:
+            continue
+        for filename in filenames:
+            default_storage.delete(posixpath.join(directory, filename))
+        directories += [posixpath.join(directory, name) for name in subdirectories]
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+import medialibrary.common.models as common_m
+import medialibrary.common.tasks as common_t
+
+
+class Command(BaseCommand):
+    help = "Builds the resized variants of photos that have none yet."
+
+    def handle(self, *args, **options):
+        photos = common_m.Photo.objects.filter(variants={}).only("id", "photo")
+        built = 0
+        for photo in photos.iterator():
+            common_t.generate_photo_variants(photo.pk, photo.photo.name)
+            built += 1
+        self.stdout.write(f"{built} photos processed")
@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+import medialibrary.common.tasks as common_t
+
+
+class Command(BaseCommand):
+    help = "Deletes video preview photos no video refers to, with their files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=60,
+            help=(
+                "Keep previews created less than this many minutes ago, which "
+                "a running preview task may be about to assign."
+            ),
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        previews = common_t.get_orphan_previews().filter(
+            created_at__lt=timezone.now() - timedelta(minutes=options["min_age"])
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{previews.count()} orphaned previews found")
+            return
+
+        deleted = common_t.delete_photos(previews)
+        self.stdout.write(f"{deleted} orphaned previews deleted")
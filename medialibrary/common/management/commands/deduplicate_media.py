@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+import medialibrary.common.models as common_m
+
+
+class Command(BaseCommand):
+    help = "Moves photos and videos uploaded before deduplication to blobs."
+
+    def handle(self, *args, **options):
+        for model in (common_m.Photo, common_m.Video):
+            field = model.blob_file_field
+            moved = 0
+            for item in model.objects.filter(blob__isnull=True).iterator():
+                file = getattr(item, field)
+                with transaction.atomic():
+                    blob = common_m.Blob.objects.acquire(file, model.blob_prefix)
+                    # Not a new upload, so previews and variants stay valid.
+                    model.objects.filter(pk=item.pk).update(
+                        blob=blob, **{field: blob.name}
+                    )
+                if file.name != blob.name:
+                    file.storage.delete(file.name)
+                moved += 1
+
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {moved} files deduplicated"
+            )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+import medialibrary.common.constants as common_c
+import medialibrary.common.models as common_m
+import medialibrary.common.tasks as common_t
+
+
+class Command(BaseCommand):
+    help = "Queues HLS transcoding of videos that have no ladder yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Also queue videos whose transcoding failed.",
+        )
+
+    def handle(self, *args, **options):
+        statuses = [common_c.HLS_STATUS_PENDING]
+        if options["retry_failed"]:
+            statuses.append(common_c.HLS_STATUS_FAILED)
+
+        videos = common_m.Video.objects.filter(hls_status__in=statuses).only(
+            "id", "video"
+        )
+        queued = 0
+        for video in videos.iterator():
+            common_t.transcode_video_hls.delay(video.pk, video.video.name)
+            queued += 1
+        self.stdout.write(f"{queued} videos queued")
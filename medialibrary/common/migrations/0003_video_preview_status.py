@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-19 15:59
+
+from django.db import migrations, models
+
+
+def backfill_preview_status(apps, schema_editor):
+    # Previews used to be extracted on save, so existing ones are ready.
+    Video = apps.get_model("common", "Video")
+    Video.objects.filter(preview__isnull=False).update(preview_status=9)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0002_alter_photo_type_video"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="video",
+            name="preview_status",
+            field=models.IntegerField(
+                choices=[
+                    (3, "Pending"),
+                    (6, "Processing"),
+                    (9, "Ready"),
+                    (12, "Failed"),
+                ],
+                default=3,
+                editable=False,
+                verbose_name="Preview status",
+            ),
+        ),
+        migrations.RunPython(backfill_preview_status, migrations.RunPython.noop),
+    ]
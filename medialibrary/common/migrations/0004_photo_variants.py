@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-19 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0003_video_preview_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="photo",
+            name="variants",
+            field=models.JSONField(
+                blank=True, default=dict, editable=False, verbose_name="Variants"
+            ),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2 on 2026-10-19 16:24
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_staff_filmography_indexes"),
+        ("common", "0005_media_blobs"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VideoUpload",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255, verbose_name="Filename")),
+                ("size", models.PositiveBigIntegerField(verbose_name="Size")),
+                (
+                    "offset",
+                    models.PositiveBigIntegerField(
+                        default=0, editable=False, verbose_name="Offset"
+                    ),
+                ),
+                (
+                    "parts",
+                    models.JSONField(
+                        blank=True, default=list, editable=False, verbose_name="Parts"
+                    ),
+                ),
+                (
+                    "type",
+                    models.IntegerField(choices=[(3, "Trailer")], verbose_name="Type"),
+                ),
+                (
+                    "game",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="catalog.game",
+                    ),
+                ),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="catalog.movie",
+                    ),
+                ),
+                (
+                    "series",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="catalog.series",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="video_uploads",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[
+                            (3, "Uploading"),
+                            (6, "Queued"),
+                            (9, "Processing"),
+                            (12, "Complete"),
+                            (15, "Failed"),
+                        ],
+                        default=3,
+                        editable=False,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "video",
+                    models.ForeignKey(
+                        editable=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="common.video",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Video upload",
+                "verbose_name_plural": "Video uploads",
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0006_video_uploads"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="video",
+            name="hls_playlist",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="HLS master playlist",
+            ),
+        ),
+        migrations.AddField(
+            model_name="video",
+            name="hls_status",
+            field=models.IntegerField(
+                choices=[
+                    (3, "Pending"),
+                    (6, "Processing"),
+                    (9, "Ready"),
+                    (12, "Failed"),
+                ],
+                default=3,
+                editable=False,
+                verbose_name="HLS status",
+            ),
+        ),
+    ]
@@ -1,13 +1,138 @@
+import hashlib
+import os
 import uuid
+from contextlib import contextmanager
+from functools import partial
+from io import BytesIO
+from tempfile import SpooledTemporaryFile, TemporaryDirectory
 
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.files.temp import NamedTemporaryFile
 from django.core.validators import FileExtensionValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from moviepy.editor import VideoFileClip
+from PIL import Image, ImageOps
 
 import medialibrary.common.constants as common_c
-from medialibrary.utils.models import TimeStampedModel
+import medialibrary.common.hls as common_hls
+from medialibrary.utils.drf import invalidate_representations
+from medialibrary.utils.models import FileTrackingMixin, TimeStampedModel
+
+
+class BlobManager(models.Manager):
+    @staticmethod
+    def get_name(prefix, sha256, filename):
+        ext = os.path.splitext(filename)[1].lower()
+        return f"{prefix}/{sha256[:2]}/{sha256}{ext}"
+
+    def acquire(self, file, prefix):
+        """
+        Returns the blob with the content of `file` and takes a reference to
+        it. New content is stored as `<prefix>/<sha256[:2]>/<sha256><ext>`,
+        known content isn't stored again.
+        """
+        digest, size = hashlib.sha256(), 0
+        for chunk in file.chunks(common_c.VIDEO_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+        digest = digest.hexdigest()
+        return self.reference(
+            digest, self.get_name(prefix, digest, file.name), size, file=file
+        )
+
+    def reference(self, sha256, name, size, file=None):
+        """
+        Takes a reference to the blob with `sha256`, creating it as `name` if
+        it's new. `file` is stored unless the content already is.
+        """
+        with transaction.atomic():
+            blob, created = self.select_for_update().get_or_create(
+                sha256=sha256, defaults={"name": name, "size": size}
+            )
+            # New content may be left over from a rolled back upload, and
+            # stored content may be missing after a failed collect.
+            if file is not None and not default_storage.exists(blob.name):
+                default_storage.save(blob.name, file)
+            self.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        return blob
+
+    def release(self, pk):
+        self.filter(pk=pk).update(ref_count=F("ref_count") - 1)
+        transaction.on_commit(partial(self.collect, pk))
+
+    def collect(self, pk):
+        with transaction.atomic():
+            blob = self.select_for_update().filter(pk=pk, ref_count=0).first()
+            if blob is None:
+                return
+            blob.delete()
+            # Deleted before the commit, while the row is locked, so that a
+            # concurrent reference to the content waits and stores it anew.
+            default_storage.delete(blob.name)
+
+
+class Blob(TimeStampedModel):
+    """
+    Stored file content shared by the photos and videos that uploaded it,
+    deleted with its last reference.
+    """
+
+    sha256 = models.CharField("SHA-256", max_length=64, unique=True)
+    name = models.CharField("Name", max_length=255)
+    size = models.BigIntegerField("Size")
+    ref_count = models.PositiveIntegerField("References", default=0)
+
+    objects = BlobManager()
+
+    class Meta:
+        verbose_name = "Blob"
+        verbose_name_plural = "Blobs"
+
+    def __str__(self):
+        return self.name
+
+
+class BlobMixin(FileTrackingMixin):
+    """
+    Stores uploads of `blob_file_field` by content through `blob`.
+    """
+
+    blob_file_field = None
+    blob_prefix = None
+
+    def attach_blob(self):
+        """
+        Points `blob` at the content of a changed file. Returns whether the
+        row refers to new content.
+        """
+        field = self.blob_file_field
+        if self._state.adding and self.blob_id is not None:
+            # Referenced by a direct upload already.
+            self.mark_file_saved(field)
+            return True
+        if not self.has_file_changed(field):
+            return False
+
+        previous_id = self.blob_id
+        self.blob = Blob.objects.acquire(getattr(self, field), self.blob_prefix)
+        setattr(self, field, self.blob.name)
+        self.mark_file_saved(field)
+        if previous_id is not None:
+            Blob.objects.release(previous_id)
+        return self._state.adding or self.blob_id != previous_id
+
+
+def release_blob(sender, instance, **kwargs):
+    if instance.blob_id is not None:
+        Blob.objects.release(instance.blob_id)
+
+
+def delete_hls(sender, instance, **kwargs):
+    if instance.hls_playlist:
+        transaction.on_commit(partial(common_hls.delete, instance.hls_playlist))
 
 
 def photo_upload_to(instance, filename, *args, **kwargs) -> str:
@@ -17,12 +142,19 @@ def photo_upload_to(instance, filename, *args, **kwargs) -> str:
     return f"photos/{path}/{new_filename}.{ext}"
 
 
-class Photo(TimeStampedModel):
+class Photo(BlobMixin, TimeStampedModel):
     user = models.ForeignKey(
         "users.User", on_delete=models.CASCADE, related_name="photos", null=True
     )
     type = models.IntegerField("Type", choices=common_c.PHOTO_TYPES)
     photo = models.ImageField("Image", upload_to=photo_upload_to)
+    blob = models.ForeignKey(
+        "common.Blob",
+        on_delete=models.PROTECT,
+        related_name="photos",
+        null=True,
+        editable=False,
+    )
     movie = models.ForeignKey(
         "catalog.Movie",
         on_delete=models.SET_NULL,
@@ -45,6 +177,12 @@ class Photo(TimeStampedModel):
         null=True,
     )
 
+    variants = models.JSONField("Variants", default=dict, blank=True, editable=False)
+
+    tracked_file_fields = ("photo",)
+    blob_file_field = "photo"
+    blob_prefix = "photos"
+
     class Meta:
         verbose_name = "Photo"
         verbose_name_plural = "Photos"
@@ -52,6 +190,77 @@ class Photo(TimeStampedModel):
     def __str__(self):
         return f"Photo {self.pk}"
 
+    def get_variant_names(self):
+        return [
+            name
+            for variant in self.variants.values()
+            for name in variant["files"].values()
+        ]
+
+    def build_variants(self):
+        """
+        Writes resized copies of the photo next to the original and returns
+        `{variant: {"width": ..., "files": {extension: name}}}`. Photos
+        narrower than a variant aren't upscaled, so such variants are left
+        out.
+        """
+        Image.init()
+        formats = [
+            (ext, fmt, options)
+            for ext, fmt, options in common_c.PHOTO_VARIANT_FORMATS
+            if fmt in Image.SAVE
+        ]
+        with self.photo.open("rb"):
+            image = ImageOps.exif_transpose(Image.open(self.photo))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+        base = os.path.splitext(self.photo.name)[0]
+        variants, last_width = {}, None
+        for variant, width in common_c.PHOTO_VARIANT_WIDTHS:
+            resized = image
+            if image.width > width:
+                height = round(image.height * width / image.width)
+                resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            if resized.width == last_width:
+                continue
+            last_width = resized.width
+
+            files = {}
+            for ext, fmt, options in formats:
+                output = resized
+                if fmt == "JPEG" and resized.mode != "RGB":
+                    output = resized.convert("RGB")
+                buffer = BytesIO()
+                output.save(buffer, fmt, **options)
+                files[ext] = self.photo.storage.save(
+                    f"{base}_{variant}.{ext}", ContentFile(buffer.getvalue())
+                )
+            variants[variant] = {"width": resized.width, "files": files}
+        return variants
+
+    def save(self, *args, **kwargs):
+        stale_names = []
+        with transaction.atomic():
+            photo_changed = self.attach_blob()
+            if photo_changed:
+                stale_names = self.get_variant_names()
+                self.variants = {}
+            super().save(*args, **kwargs)
+
+        if photo_changed:
+            import medialibrary.common.tasks as common_t
+
+            invalidate_representations()
+            transaction.on_commit(
+                partial(
+                    common_t.generate_photo_variants.delay,
+                    self.pk,
+                    self.photo.name,
+                    stale_names,
+                )
+            )
+
 
 def video_upload_to(instance, filename, *args, **kwargs) -> str:
     ext = filename.split(".")[-1]
@@ -60,7 +269,7 @@ def video_upload_to(instance, filename, *args, **kwargs) -> str:
     return f"videos/{path}/{new_filename}.{ext}"
 
 
-class Video(TimeStampedModel):
+class Video(BlobMixin, TimeStampedModel):
     user = models.ForeignKey(
         "users.User",
         on_delete=models.CASCADE,
@@ -72,11 +281,33 @@ class Video(TimeStampedModel):
     preview = models.ForeignKey(
         "common.Photo", on_delete=models.SET_NULL, null=True, blank=True
     )
+    preview_status = models.IntegerField(
+        "Preview status",
+        choices=common_c.PREVIEW_STATUSES,
+        default=common_c.PREVIEW_STATUS_PENDING,
+        editable=False,
+    )
+    hls_status = models.IntegerField(
+        "HLS status",
+        choices=common_c.HLS_STATUSES,
+        default=common_c.HLS_STATUS_PENDING,
+        editable=False,
+    )
+    hls_playlist = models.CharField(
+        "HLS master playlist", max_length=255, blank=True, editable=False
+    )
     video = models.FileField(
         "Video",
         upload_to=video_upload_to,
         validators=[FileExtensionValidator(["mov", "avi", "mp4", "webm", "mkv"])],
     )
+    blob = models.ForeignKey(
+        "common.Blob",
+        on_delete=models.PROTECT,
+        related_name="videos",
+        null=True,
+        editable=False,
+    )
     movie = models.ForeignKey(
         "catalog.Movie",
         on_delete=models.SET_NULL,
@@ -99,6 +330,10 @@ class Video(TimeStampedModel):
         null=True,
     )
 
+    tracked_file_fields = ("video",)
+    blob_file_field = "video"
+    blob_prefix = "videos"
+
     class Meta:
         verbose_name = "Video"
         verbose_name_plural = "Videos"
@@ -122,22 +357,182 @@ class Video(TimeStampedModel):
     def __str__(self):
         return f"Video {self.pk}"
 
-    def set_preview(self):
-        tempvideo = NamedTemporaryFile()
-        tempvideo.write(self.video.file.read())
-        tempvideo.flush()
-        tempvideo.seek(0)
+    def copy_video(self, destination):
+        with self.video.open("rb"):
+            for chunk in self.video.chunks(common_c.VIDEO_CHUNK_SIZE):
+                destination.write(chunk)
+        destination.flush()
 
-        clip = VideoFileClip(tempvideo.name)
-        temppreview = NamedTemporaryFile(suffix=".jpg")
-        clip.save_frame(temppreview.name, t=min(1, clip.duration))
-        temppreview.flush()
-        temppreview.seek(0)
+    @contextmanager
+    def local_video_path(self):
+        """
+        Yields a local path of the video file. Storages with local files hand
+        over the stored file, others are copied to a temporary file in chunks.
+        """
+        try:
+            path = self.video.path
+        except NotImplementedError:
+            path = None
 
-        self.preview = Photo.objects.create(
-            type=common_c.PHOTO_TYPE_VIDEO_PREVIEW, photo=File(temppreview)
-        )
+        if path is not None:
+            yield path
+            return
+
+        with NamedTemporaryFile(suffix=os.path.splitext(self.video.name)[1]) as f:
+            self.copy_video(f)
+            yield f.name
+
+    def extract_preview(self):
+        # ffmpeg seeks close to the frame, so only the container index and the
+        # bytes around it are decoded.
+        with (
+            self.local_video_path() as path,
+            NamedTemporaryFile(suffix=".jpg") as temppreview,
+        ):
+            clip = VideoFileClip(path, audio=False)
+            try:
+                clip.save_frame(temppreview.name, t=min(1, clip.duration))
+            finally:
+                clip.close()
+
+            return Photo.objects.create(
+                type=common_c.PHOTO_TYPE_VIDEO_PREVIEW, photo=File(temppreview)
+            )
+
+    def transcode_hls(self):
+        """
+        Transcodes the video to the HLS ladder in storage and returns the name
+        of its master playlist.
+        """
+        with self.local_video_path() as path, TemporaryDirectory() as output:
+            common_hls.transcode(path, output)
+            return common_hls.save(output, f"videos/hls/{uuid.uuid4()}")
 
     def save(self, *args, **kwargs):
-        self.set_preview()
-        super().save(*args, **kwargs)
+        # The preview is extracted by a task once the row is committed.
+        with transaction.atomic():
+            video_changed = self.attach_blob()
+            if video_changed:
+                self.preview_status = common_c.PREVIEW_STATUS_PENDING
+                self.hls_status = common_c.HLS_STATUS_PENDING
+            super().save(*args, **kwargs)
+
+        if video_changed:
+            import medialibrary.common.tasks as common_t
+
+            transaction.on_commit(
+                partial(common_t.generate_video_preview.delay, self.pk, self.video.name)
+            )
+            transaction.on_commit(
+                partial(common_t.transcode_video_hls.delay, self.pk, self.video.name)
+            )
+
+
+class VideoUpload(TimeStampedModel):
+    """
+    A resumable video upload. Chunks are stored as separate parts in the
+    order received and joined into a `Video` by a task once the upload is
+    finalized.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        "users.User", on_delete=models.CASCADE, related_name="video_uploads"
+    )
+    filename = models.CharField("Filename", max_length=255)
+    size = models.PositiveBigIntegerField("Size")
+    offset = models.PositiveBigIntegerField("Offset", default=0, editable=False)
+    parts = models.JSONField("Parts", default=list, blank=True, editable=False)
+    status = models.IntegerField(
+        "Status",
+        choices=common_c.VIDEO_UPLOAD_STATUSES,
+        default=common_c.VIDEO_UPLOAD_STATUS_UPLOADING,
+        editable=False,
+    )
+    video = models.ForeignKey(
+        "common.Video",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        editable=False,
+    )
+    type = models.IntegerField("Type", choices=common_c.VIDEO_TYPES)
+    movie = models.ForeignKey(
+        "catalog.Movie", on_delete=models.CASCADE, blank=True, null=True
+    )
+    game = models.ForeignKey(
+        "catalog.Game", on_delete=models.CASCADE, blank=True, null=True
+    )
+    series = models.ForeignKey(
+        "catalog.Series", on_delete=models.CASCADE, blank=True, null=True
+    )
+
+    class Meta:
+        verbose_name = "Video upload"
+        verbose_name_plural = "Video uploads"
+
+    def __str__(self):
+        return f"Video upload {self.pk}"
+
+    def append(self, stream, length):
+        """
+        Stores up to `length` bytes of `stream` as the next part, copying it
+        in chunks. Returns the number of bytes stored.
+        """
+        with SpooledTemporaryFile(max_size=common_c.VIDEO_CHUNK_SIZE) as part:
+            received = 0
+            while received < length:
+                chunk = stream.read(min(common_c.VIDEO_CHUNK_SIZE, length - received))
+                if not chunk:
+                    break
+                part.write(chunk)
+                received += len(chunk)
+            if not received:
+                return 0
+
+            name = default_storage.save(
+                f"uploads/videos/{self.pk}/{self.offset:020d}", File(part)
+            )
+        self.parts.append(name)
+        self.offset += received
+        return received
+
+    @contextmanager
+    def open_joined(self):
+        """
+        Yields the parts joined into a temporary file, as a `File` named after
+        the uploaded file, and the SHA-256 of its content, hashed while the
+        parts are joined.
+        """
+        digest = hashlib.sha256()
+        with NamedTemporaryFile(suffix=os.path.splitext(self.filename)[1]) as f:
+            for name in self.parts:
+                with default_storage.open(name, "rb") as part:
+                    for chunk in part.chunks(common_c.VIDEO_CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+            f.flush()
+            f.seek(0)
+            yield File(f, name=self.filename), digest.hexdigest()
+
+    def create_video(self):
+        """
+        Creates the video from the joined parts, reading them only once.
+        """
+        with self.open_joined() as (file, sha256):
+            name = Blob.objects.get_name(Video.blob_prefix, sha256, self.filename)
+            with transaction.atomic():
+                blob = Blob.objects.reference(sha256, name, self.size, file=file)
+                return Video.objects.create(
+                    user=self.user,
+                    type=self.type,
+                    movie=self.movie,
+                    series=self.series,
+                    game=self.game,
+                    blob=blob,
+                    video=blob.name,
+                )
+
+    def delete_parts(self):
+        for name in self.parts:
+            default_storage.delete(name)
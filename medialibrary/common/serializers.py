@@ -1,17 +1,188 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.core.validators import validate_image_file_extension
+from django.db import models
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+import medialibrary.catalog.models as catalog_m
+import medialibrary.common.constants as common_c
 import medialibrary.common.models as common_m
 
 
+def absolute_srcset(request, srcset):
+    return {
+        ext: ", ".join(
+            f"{request.build_absolute_uri(url)} {width}"
+            for url, width in (
+                candidate.rsplit(" ", 1) for candidate in candidates.split(", ")
+            )
+        )
+        for ext, candidates in srcset.items()
+    }
+
+
+@extend_schema_field(
+    {"type": "object", "additionalProperties": {"type": "string"}},
+)
+class SrcsetField(serializers.Field):
+    """
+    Renders `Photo.variants` as a `srcset` string per file extension, e.g.
+    `{"webp": "<url> 160w, <url> 480w"}`.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        storage = common_m.Photo._meta.get_field("photo").storage
+        candidates = {}
+        for variant in sorted(variants.values(), key=itemgetter("width")):
+            for ext, name in variant["files"].items():
+                candidates.setdefault(ext, []).append(
+                    f"{storage.url(name)} {variant['width']}w"
+                )
+        srcset = {ext: ", ".join(urls) for ext, urls in candidates.items()}
+
+        request = self.context.get("request")
+        if request is not None:
+            return absolute_srcset(request, srcset)
+        return srcset
+
+
 class PhotoSerializer(serializers.ModelSerializer):
+    srcset = SrcsetField(source="variants")
+
     class Meta:
         model = common_m.Photo
-        fields = "__all__"
+        exclude = ("variants", "blob")
 
 
 class VideoSerializer(serializers.ModelSerializer):
     preview = PhotoSerializer(read_only=True)
+    hls = serializers.SerializerMethodField(help_text="HLS master playlist URL")
 
     class Meta:
         model = common_m.Video
-        fields = "__all__"
+        exclude = ("hls_playlist", "blob")
+
+    @extend_schema_field(OpenApiTypes.URI)
+    def get_hls(self, video):
+        if video.hls_status != common_c.HLS_STATUS_READY:
+            return None
+        url = video.video.storage.url(video.hls_playlist)
+        request = self.context.get("request")
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class VideoUploadSerializer(serializers.ModelSerializer):
+    size = serializers.IntegerField(
+        min_value=1, max_value=settings.VIDEO_UPLOAD_MAX_SIZE
+    )
+
+    class Meta:
+        model = common_m.VideoUpload
+        fields = (
+            "id",
+            "filename",
+            "size",
+            "offset",
+            "status",
+            "video",
+            "type",
+            "movie",
+            "series",
+            "game",
+            "created_at",
+        )
+
+    def validate_filename(self, value):
+        for validator in common_m.Video._meta.get_field("video").validators:
+            validator(File(None, name=value))
+        return value
+
+    def validate(self, attrs):
+        if (
+            sum(attrs.get(field) is not None for field in ("movie", "series", "game"))
+            != 1
+        ):
+            raise serializers.ValidationError(
+                "Exactly one of movie, series and game is required."
+            )
+        return attrs
+
+
+class DirectUploadSerializer(serializers.Serializer):
+    KIND_MODELS = {"photo": common_m.Photo, "video": common_m.Video}
+
+    kind = serializers.ChoiceField(choices=list(KIND_MODELS))
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r"^[0-9a-f]{64}$", help_text="Hex digest")
+
+    def validate(self, attrs):
+        model = self.KIND_MODELS[attrs["kind"]]
+        field = model._meta.get_field(model.blob_file_field)
+        validators = list(field.validators)
+        if isinstance(field, models.ImageField):
+            # Only the form field checks the extension of images.
+            validators.append(validate_image_file_extension)
+        try:
+            for validator in validators:
+                validator(File(None, name=attrs["filename"]))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"filename": e.messages})
+
+        max_size = {
+            "photo": settings.PHOTO_UPLOAD_MAX_SIZE,
+            "video": settings.VIDEO_UPLOAD_MAX_SIZE,
+        }[attrs["kind"]]
+        if attrs["size"] > max_size:
+            raise serializers.ValidationError(
+                {"size": f"Ensure this value is less than or equal to {max_size}."}
+            )
+
+        attrs["model"] = model
+        attrs["name"] = common_m.Blob.objects.get_name(
+            model.blob_prefix, attrs["sha256"], attrs["filename"]
+        )
+        return attrs
+
+
+class DirectUploadFinalizeSerializer(DirectUploadSerializer):
+    type = serializers.IntegerField()
+    movie = serializers.PrimaryKeyRelatedField(
+        queryset=catalog_m.Movie.objects.all(), required=False, allow_null=True
+    )
+    series = serializers.PrimaryKeyRelatedField(
+        queryset=catalog_m.Series.objects.all(), required=False, allow_null=True
+    )
+    game = serializers.PrimaryKeyRelatedField(
+        queryset=catalog_m.Game.objects.all(), required=False, allow_null=True
+    )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        types = dict(attrs["model"]._meta.get_field("type").choices)
+        if attrs["type"] not in types:
+            raise serializers.ValidationError(
+                {"type": f'"{attrs["type"]}" is not a valid choice.'}
+            )
+        if (
+            attrs["kind"] == "video"
+            and sum(
+                attrs.get(field) is not None for field in ("movie", "series", "game")
+            )
+            != 1
+        ):
+            raise serializers.ValidationError(
+                "Exactly one of movie, series and game is required."
+            )
+        return attrs
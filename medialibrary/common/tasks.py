@@ -0,0 +1,182 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+import medialibrary.common.constants as common_c
+import medialibrary.common.hls as common_hls
+import medialibrary.common.models as common_m
+from medialibrary.utils.drf import invalidate_representations
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generate_video_preview(video_id, video_name):
+    """
+    Extracts the preview of the video file `video_name`. Does nothing if the
+    video was deleted, its file was replaced since, or the preview is ready,
+    so the task is safe to retry or deliver twice.
+    """
+    videos = common_m.Video.objects.filter(pk=video_id, video=video_name)
+    video = videos.first()
+    if video is None or video.preview_status == common_c.PREVIEW_STATUS_READY:
+        return
+
+    videos.update(preview_status=common_c.PREVIEW_STATUS_PROCESSING)
+    try:
+        preview = video.extract_preview()
+    except Exception as e:
+        logger.error(f"Failed to extract preview of video {video_id}: {type(e)} {e}")
+        videos.update(preview_status=common_c.PREVIEW_STATUS_FAILED)
+        return
+
+    videos.update(preview=preview, preview_status=common_c.PREVIEW_STATUS_READY)
+    if video.preview_id:
+        # The preview of the replaced file.
+        delete_photos(get_orphan_previews().filter(pk=video.preview_id))
+
+
+@shared_task(acks_late=True)
+def transcode_video_hls(video_id, video_name):
+    """
+    Transcodes the video file `video_name` to the HLS ladder and deletes the
+    ladder of the file it replaced. Routed to the "transcoding" queue. Does
+    nothing if the video was deleted, its file was replaced since, or the
+    ladder is ready or being built, so the task is safe to retry or deliver
+    twice. Redis redelivers jobs running past its visibility timeout, which
+    long transcodes do.
+    """
+    videos = common_m.Video.objects.filter(pk=video_id, video=video_name)
+    claimed = videos.filter(
+        hls_status__in=(common_c.HLS_STATUS_PENDING, common_c.HLS_STATUS_FAILED)
+    ).update(hls_status=common_c.HLS_STATUS_PROCESSING)
+    if not claimed:
+        return
+
+    video = videos.first()
+    if video is None:
+        return
+    try:
+        playlist = video.transcode_hls()
+    except Exception as e:
+        logger.error(f"Failed to transcode video {video_id}: {type(e)} {e}")
+        videos.update(hls_status=common_c.HLS_STATUS_FAILED)
+        return
+
+    with transaction.atomic():
+        video = videos.select_for_update().first()
+        if video is None:
+            # Transcoded a file that was replaced or deleted meanwhile.
+            common_hls.delete(playlist)
+            return
+        videos.update(hls_playlist=playlist, hls_status=common_c.HLS_STATUS_READY)
+
+    if video.hls_playlist:
+        common_hls.delete(video.hls_playlist)
+
+
+@shared_task
+def generate_photo_variants(photo_id, photo_name, stale_names=()):
+    """
+    Builds the resized variants of the photo file `photo_name` and deletes
+    `stale_names`, the variants of the file it replaced. Does nothing if the
+    photo was deleted, its file was replaced since, or the variants exist.
+    """
+    storage = common_m.Photo._meta.get_field("photo").storage
+    for name in stale_names:
+        storage.delete(name)
+
+    photos = common_m.Photo.objects.filter(pk=photo_id, photo=photo_name)
+    photo = photos.first()
+    if photo is None or photo.variants:
+        return
+
+    try:
+        variants = photo.build_variants()
+    except Exception as e:
+        logger.error(f"Failed to build variants of photo {photo_id}: {type(e)} {e}")
+        return
+
+    with transaction.atomic():
+        photo = photos.select_for_update().first()
+        if photo is not None and not photo.variants:
+            photo.variants = variants
+            photo.save(update_fields=["variants", "updated_at"])
+            invalidate_representations()
+            return
+
+    # Built for a file that was replaced or deleted meanwhile.
+    for variant in variants.values():
+        for name in variant["files"].values():
+            storage.delete(name)
+
+
+@shared_task
+def finalize_video_upload(upload_id):
+    """
+    Creates the video of a finalized upload and deletes its parts. Only the
+    delivery that moves the upload from queued to processing does the work,
+    so the task is safe to deliver twice.
+    """
+    uploads = common_m.VideoUpload.objects.filter(pk=upload_id)
+    claimed = uploads.filter(status=common_c.VIDEO_UPLOAD_STATUS_QUEUED).update(
+        status=common_c.VIDEO_UPLOAD_STATUS_PROCESSING, updated_at=timezone.now()
+    )
+    upload = uploads.first()
+    if not claimed or upload is None:
+        return
+
+    try:
+        video = upload.create_video()
+    except Exception as e:
+        logger.error(f"Failed to finalize video upload {upload_id}: {type(e)} {e}")
+        uploads.update(status=common_c.VIDEO_UPLOAD_STATUS_FAILED)
+        return
+
+    uploads.update(
+        status=common_c.VIDEO_UPLOAD_STATUS_COMPLETE,
+        video=video,
+        parts=[],
+        updated_at=timezone.now(),
+    )
+    upload.delete_parts()
+
+
+@shared_task
+def delete_expired_video_uploads():
+    expired = common_m.VideoUpload.objects.filter(
+        updated_at__lt=timezone.now()
+        - timedelta(hours=settings.VIDEO_UPLOAD_EXPIRATION_HOURS)
+    )
+    for upload in expired.exclude(
+        status=common_c.VIDEO_UPLOAD_STATUS_PROCESSING
+    ).iterator():
+        upload.delete()
+        upload.delete_parts()
+
+
+def get_orphan_previews():
+    return common_m.Photo.objects.filter(
+        type=common_c.PHOTO_TYPE_VIDEO_PREVIEW, video__isnull=True
+    )
+
+
+def delete_photos(photos):
+    """
+    Deletes the photos along with their files, which are otherwise left in
+    storage. Returns the number of photos deleted.
+    """
+    deleted = 0
+    for photo in photos.iterator():
+        for name in photo.get_variant_names():
+            photo.photo.storage.delete(name)
+        # Content stored by blob is released on delete.
+        if photo.blob_id is None:
+            photo.photo.delete(save=False)
+        photo.delete()
+        deleted += 1
+    return deleted
@@ -0,0 +1,1012 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+import requests
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db.models import Count
+from django.db.models.fields.files import FieldFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+import medialibrary.catalog.models as catalog_m
+import medialibrary.common.constants as common_c
+import medialibrary.common.hls as common_hls
+import medialibrary.common.models as common_m
+import medialibrary.common.serializers as common_s
+import medialibrary.common.tasks as common_t
+import medialibrary.users.models as users_m
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+TEMP_MEDIA = tempfile.mktemp()
+
+
+def assert_blobs_referenced(test):
+    for blob in common_m.Blob.objects.annotate(
+        photo_count=Count("photos", distinct=True),
+        video_count=Count("videos", distinct=True),
+    ):
+        test.assertEqual(blob.ref_count, blob.photo_count + blob.video_count)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA)
+class TestVideoPreview(TestCase):
+    def setUp(self):
+        self.movies = [
+            catalog_m.Movie.objects.create(title=f"Test Movie {i}") for i in range(2)
+        ]
+
+    def create_video(self):
+        with open("medialibrary/utils/test_data/video.mp4", "rb") as f:
+            return common_m.Video.objects.create(
+                video=File(f),
+                type=common_c.VIDEO_TYPE_TRAILER,
+                movie=self.movies[0],
+            )
+
+    def test_preview_scheduled_on_commit(self):
+        with (
+            mock.patch.object(common_t.generate_video_preview, "delay") as delay,
+            mock.patch.object(common_t.transcode_video_hls, "delay") as transcode,
+        ):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                video = self.create_video()
+                delay.assert_not_called()
+            self.assertEqual(len(callbacks), 2)
+            delay.assert_called_once_with(video.pk, video.video.name)
+            transcode.assert_called_once_with(video.pk, video.video.name)
+
+        self.assertIsNone(video.preview)
+        self.assertEqual(video.preview_status, common_c.PREVIEW_STATUS_PENDING)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            video.movie = self.movies[1]
+            video.save()
+        self.assertEqual(callbacks, [])
+
+    def test_generate_video_preview(self):
+        video = self.create_video()
+
+        common_t.generate_video_preview(video.pk, video.video.name)
+        video.refresh_from_db()
+        self.assertEqual(video.preview_status, common_c.PREVIEW_STATUS_READY)
+        self.assertEqual(video.preview.type, common_c.PHOTO_TYPE_VIDEO_PREVIEW)
+
+        # Delivered twice
+        with self.assertNumQueries(1):
+            common_t.generate_video_preview(video.pk, video.video.name)
+        self.assertEqual(common_m.Photo.objects.count(), 1)
+
+    def test_generate_video_preview_skips_replaced_file(self):
+        video = self.create_video()
+
+        common_t.generate_video_preview(video.pk, "videos/Trailer/replaced.mp4")
+        video.refresh_from_db()
+        self.assertIsNone(video.preview)
+        self.assertEqual(video.preview_status, common_c.PREVIEW_STATUS_PENDING)
+
+    def test_generate_video_preview_failed(self):
+        video = self.create_video()
+
+        with (
+            mock.patch.object(
+                common_m.Video, "extract_preview", side_effect=OSError("corrupt")
+            ),
+            self.assertLogs(common_t.logger, "ERROR"),
+        ):
+            common_t.generate_video_preview(video.pk, video.video.name)
+        video.refresh_from_db()
+        self.assertEqual(video.preview_status, common_c.PREVIEW_STATUS_FAILED)
+
+    def test_local_video_path(self):
+        video = self.create_video()
+
+        with video.local_video_path() as path:
+            self.assertEqual(path, video.video.path)
+
+        with mock.patch.object(
+            FieldFile,
+            "path",
+            new_callable=mock.PropertyMock,
+            side_effect=NotImplementedError,
+        ):
+            with video.local_video_path() as path:
+                self.assertNotEqual(path, video.video.name)
+                with open(path, "rb") as f, video.video.open("rb"):
+                    self.assertEqual(f.read(), video.video.read())
+        self.assertFalse(os.path.exists(path))
+
+    def test_metadata_save_keeps_preview(self):
+        video = self.create_video()
+        common_t.generate_video_preview(video.pk, video.video.name)
+        video = common_m.Video.objects.get(pk=video.pk)
+        preview = video.preview
+
+        with (
+            mock.patch.object(common_m, "VideoFileClip") as clip,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+        ):
+            video.movie = self.movies[1]
+            video.save()
+
+            deferred = common_m.Video.objects.defer("video").get(pk=video.pk)
+            deferred.movie = self.movies[0]
+            deferred.save()
+        self.assertEqual(callbacks, [])
+        clip.assert_not_called()
+
+        video.refresh_from_db()
+        self.assertEqual(video.preview, preview)
+        self.assertEqual(video.preview_status, common_c.PREVIEW_STATUS_READY)
+
+    def test_replaced_file_rebuilds_preview(self):
+        video = self.create_video()
+        common_t.generate_video_preview(video.pk, video.video.name)
+        video = common_m.Video.objects.get(pk=video.pk)
+        old_preview = video.preview
+
+        with (
+            mock.patch.object(common_t.generate_video_preview, "delay") as delay,
+            mock.patch.object(common_t.transcode_video_hls, "delay"),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            with open("medialibrary/utils/test_data/video.mp4", "rb") as f:
+                video.video = ContentFile(f.read() + bytes(16), name="replaced.mp4")
+                video.save()
+            # A second save of the same file is not a change.
+            video.save()
+        delay.assert_called_once_with(video.pk, video.video.name)
+        self.assertEqual(video.preview_status, common_c.PREVIEW_STATUS_PENDING)
+
+        common_t.generate_video_preview(video.pk, video.video.name)
+        video.refresh_from_db()
+        self.assertNotEqual(video.preview, old_preview)
+        self.assertEqual(video.preview_status, common_c.PREVIEW_STATUS_READY)
+        self.assertFalse(common_m.Photo.objects.filter(pk=old_preview.pk).exists())
+        assert_blobs_referenced(self)
+
+    def test_cleanup_video_previews(self):
+        video = self.create_video()
+        common_t.generate_video_preview(video.pk, video.video.name)
+        video.refresh_from_db()
+        with open("medialibrary/utils/test_data/photo.png", "rb") as f:
+            orphans = [
+                common_m.Photo.objects.create(
+                    photo=File(f), type=common_c.PHOTO_TYPE_VIDEO_PREVIEW
+                )
+                for _ in range(3)
+            ]
+            poster = common_m.Photo.objects.create(
+                photo=File(f), type=common_c.PHOTO_TYPE_POSTER
+            )
+        common_m.Photo.objects.filter(pk__in=[orphans[0].pk, orphans[1].pk]).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        common_m.Photo.objects.filter(pk=video.preview_id).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+
+        out = StringIO()
+        call_command("cleanup_video_previews", "--dry-run", stdout=out)
+        self.assertIn("2 orphaned previews found", out.getvalue())
+        self.assertEqual(common_m.Photo.objects.count(), 5)
+
+        out = StringIO()
+        call_command("cleanup_video_previews", stdout=out)
+        self.assertIn("2 orphaned previews deleted", out.getvalue())
+        self.assertQuerySetEqual(
+            common_m.Photo.objects.order_by("pk"),
+            [video.preview_id, orphans[2].pk, poster.pk],
+            transform=lambda photo: photo.pk,
+        )
+        # The image is still shared with the remaining photos.
+        self.assertTrue(poster.photo.storage.exists(orphans[0].photo.name))
+        assert_blobs_referenced(self)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA)
+class TestHLSTranscoding(TestCase):
+    def setUp(self):
+        self.movie = catalog_m.Movie.objects.create(title="Test Movie")
+
+    def create_video(self):
+        with open("medialibrary/utils/test_data/video.mp4", "rb") as f:
+            return common_m.Video.objects.create(
+                video=File(f),
+                type=common_c.VIDEO_TYPE_TRAILER,
+                movie=self.movie,
+            )
+
+    def test_renditions(self):
+        renditions = common_hls.get_renditions(1920, 1080)
+        self.assertEqual(
+            [(rendition["name"], rendition["size"]) for rendition in renditions],
+            [("360p", (640, 360)), ("720p", (1280, 720)), ("1080p", (1920, 1080))],
+        )
+        # Portrait videos aren't upscaled to the width of the ladder.
+        renditions = common_hls.get_renditions(464, 848)
+        self.assertEqual(
+            [(rendition["name"], rendition["size"]) for rendition in renditions],
+            [("360p", (360, 658))],
+        )
+        renditions = common_hls.get_renditions(320, 240)
+        self.assertEqual(
+            [(rendition["name"], rendition["size"]) for rendition in renditions],
+            [("240p", (320, 240))],
+        )
+
+    def test_transcode_video_hls(self):
+        video = self.create_video()
+        self.assertEqual(video.hls_status, common_c.HLS_STATUS_PENDING)
+        self.assertIsNone(common_s.VideoSerializer(video).data["hls"])
+
+        common_t.transcode_video_hls(video.pk, video.video.name)
+        video.refresh_from_db()
+        self.assertEqual(video.hls_status, common_c.HLS_STATUS_READY)
+        storage = video.video.storage
+        with storage.open(video.hls_playlist) as f:
+            self.assertIn(b"360p/index.m3u8", f.read())
+        directory = os.path.dirname(video.hls_playlist)
+        with storage.open(f"{directory}/360p/index.m3u8") as f:
+            self.assertIn(b"#EXT-X-ENDLIST", f.read())
+        self.assertEqual(
+            common_s.VideoSerializer(video).data["hls"],
+            storage.url(video.hls_playlist),
+        )
+
+        with mock.patch.object(common_hls, "transcode") as transcode:
+            common_t.transcode_video_hls(video.pk, video.video.name)
+        transcode.assert_not_called()
+
+    def test_replaced_file_replaces_ladder(self):
+        video = self.create_video()
+        common_t.transcode_video_hls(video.pk, video.video.name)
+        video.refresh_from_db()
+        old_playlist = video.hls_playlist
+
+        with (
+            mock.patch.object(common_t.generate_video_preview, "delay"),
+            mock.patch.object(common_t.transcode_video_hls, "delay") as delay,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            with open("medialibrary/utils/test_data/video.mp4", "rb") as f:
+                video.video = ContentFile(f.read() + bytes(16), name="replaced.mp4")
+                video.save()
+        delay.assert_called_once_with(video.pk, video.video.name)
+        self.assertEqual(video.hls_status, common_c.HLS_STATUS_PENDING)
+
+        common_t.transcode_video_hls(video.pk, video.video.name)
+        video.refresh_from_db()
+        self.assertNotEqual(video.hls_playlist, old_playlist)
+        storage = video.video.storage
+        self.assertTrue(storage.exists(video.hls_playlist))
+        self.assertFalse(storage.exists(old_playlist))
+
+    def test_transcode_claimed_once(self):
+        video = self.create_video()
+        common_m.Video.objects.filter(pk=video.pk).update(
+            hls_status=common_c.HLS_STATUS_PROCESSING
+        )
+        # A redelivery while another worker transcodes the same file.
+        with mock.patch.object(common_hls, "transcode") as transcode:
+            common_t.transcode_video_hls(video.pk, video.video.name)
+        transcode.assert_not_called()
+
+    def test_transcode_failed(self):
+        video = self.create_video()
+        with (
+            mock.patch.object(
+                common_hls, "transcode", side_effect=RuntimeError("Invalid data")
+            ),
+            self.assertLogs(common_t.logger, "ERROR"),
+        ):
+            common_t.transcode_video_hls(video.pk, video.video.name)
+        video.refresh_from_db()
+        self.assertEqual(video.hls_status, common_c.HLS_STATUS_FAILED)
+        self.assertEqual(video.hls_playlist, "")
+
+    def test_transcode_videos_command(self):
+        pending, failed = self.create_video(), self.create_video()
+        common_m.Video.objects.filter(pk=failed.pk).update(
+            hls_status=common_c.HLS_STATUS_FAILED
+        )
+
+        for args, videos in (((), [pending]), (("--retry-failed",), [pending, failed])):
+            with mock.patch.object(common_t.transcode_video_hls, "delay") as delay:
+                call_command("transcode_videos", *args, stdout=StringIO())
+            self.assertEqual(
+                sorted(call.args for call in delay.call_args_list),
+                [(video.pk, video.video.name) for video in videos],
+            )
+
+    def test_deleted_video_deletes_ladder(self):
+        video = self.create_video()
+        common_t.transcode_video_hls(video.pk, video.video.name)
+        video.refresh_from_db()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            video.delete()
+        self.assertFalse(video.video.storage.exists(video.hls_playlist))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA)
+class TestPhotoVariants(TestCase):
+    def create_photo(self, size=(1000, 1500)):
+        buffer = BytesIO()
+        Image.linear_gradient("L").resize(size).convert("RGB").save(buffer, "JPEG")
+        return common_m.Photo.objects.create(
+            photo=ContentFile(buffer.getvalue(), name="poster.jpg"),
+            type=common_c.PHOTO_TYPE_POSTER,
+        )
+
+    def test_generate_photo_variants(self):
+        with mock.patch.object(common_t.generate_photo_variants, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                photo = self.create_photo()
+            delay.assert_called_once_with(photo.pk, photo.photo.name, [])
+
+        common_t.generate_photo_variants(photo.pk, photo.photo.name)
+        photo.refresh_from_db()
+        self.assertEqual(
+            {variant: data["width"] for variant, data in photo.variants.items()},
+            {"thumb": 160, "card": 480, "full": 1000},
+        )
+        base = os.path.splitext(photo.photo.name)[0]
+        self.assertEqual(photo.variants["card"]["files"]["webp"], f"{base}_card.webp")
+        with photo.photo.storage.open(photo.variants["thumb"]["files"]["jpg"]) as f:
+            self.assertEqual(Image.open(f).size, (160, 240))
+
+        data = common_s.PhotoSerializer(photo).data
+        self.assertNotIn("variants", data)
+        self.assertEqual(
+            data["srcset"]["webp"],
+            ", ".join(
+                f"{photo.photo.storage.url(f'{base}_{variant}.webp')} {width}w"
+                for variant, width in (("thumb", 160), ("card", 480), ("full", 1000))
+            ),
+        )
+
+    def test_replaced_photo_drops_stale_variants(self):
+        photo = self.create_photo(size=(300, 300))
+        common_t.generate_photo_variants(photo.pk, photo.photo.name)
+        photo = common_m.Photo.objects.get(pk=photo.pk)
+        self.assertEqual(set(photo.variants), {"thumb", "card"})
+        stale_names = photo.get_variant_names()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            photo.movie = catalog_m.Movie.objects.create(title="Test Movie")
+            photo.save()
+        self.assertEqual(callbacks, [])
+
+        with (
+            mock.patch.object(common_t.generate_photo_variants, "delay") as delay,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            with open("medialibrary/utils/test_data/photo.png", "rb") as f:
+                photo.photo = File(f, name="photo.png")
+                photo.save()
+        delay.assert_called_once_with(photo.pk, photo.photo.name, stale_names)
+        self.assertEqual(photo.variants, {})
+
+        common_t.generate_photo_variants(*delay.call_args.args)
+        for name in stale_names:
+            self.assertFalse(photo.photo.storage.exists(name))
+        photo.refresh_from_db()
+        self.assertEqual(photo.variants["card"]["width"], 184)
+
+        call_command("build_photo_variants", stdout=StringIO())
+        self.assertEqual(
+            common_m.Photo.objects.get(pk=photo.pk).variants, photo.variants
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA)
+class TestBlobs(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(common_t.generate_photo_variants, "delay")
+        self.generate_variants = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_photo(self, content=None):
+        if content is None:
+            with open("medialibrary/utils/test_data/photo.png", "rb") as f:
+                content = f.read()
+        return common_m.Photo.objects.create(
+            photo=ContentFile(content, name="Poster.PNG"),
+            type=common_c.PHOTO_TYPE_POSTER,
+        )
+
+    def test_duplicate_uploads_share_blob(self):
+        photos = [self.create_photo() for _ in range(2)]
+
+        blob = common_m.Blob.objects.get()
+        with open("medialibrary/utils/test_data/photo.png", "rb") as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        self.assertEqual(blob.sha256, sha256)
+        self.assertEqual(blob.name, f"photos/{sha256[:2]}/{sha256}.png")
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual([photo.photo.name for photo in photos], [blob.name] * 2)
+        storage = photos[0].photo.storage
+        self.assertEqual(
+            storage.listdir(os.path.dirname(blob.name)), ([], [f"{sha256}.png"])
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photos[0].delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(storage.exists(blob.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photos[1].delete()
+        self.assertFalse(common_m.Blob.objects.exists())
+        self.assertFalse(storage.exists(blob.name))
+
+    def test_collect_deletes_file_with_row(self):
+        photo = self.create_photo()
+        blob = photo.blob
+        common_m.Photo.objects.filter(pk=photo.pk).update(blob=None)
+        common_m.Blob.objects.filter(pk=blob.pk).update(ref_count=0)
+
+        # Not deferred past the commit, where a concurrent upload of the same
+        # content could have found the file still stored.
+        with self.captureOnCommitCallbacks() as callbacks:
+            common_m.Blob.objects.collect(blob.pk)
+        self.assertEqual(callbacks, [])
+        self.assertFalse(photo.photo.storage.exists(blob.name))
+
+    def test_missing_content_stored_again(self):
+        photo = self.create_photo()
+        storage = photo.photo.storage
+        storage.delete(photo.blob.name)
+
+        other = self.create_photo()
+        self.assertEqual(other.blob, photo.blob)
+        self.assertTrue(storage.exists(photo.blob.name))
+
+    def test_replaced_upload_releases_blob(self):
+        photo = self.create_photo()
+        other = self.create_photo()
+        old_blob = photo.blob
+
+        buffer = BytesIO()
+        Image.new("RGB", (10, 10)).save(buffer, "PNG")
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.photo = ContentFile(buffer.getvalue(), name="replaced.png")
+            photo.save()
+        self.assertNotEqual(photo.blob, old_blob)
+        old_blob.refresh_from_db()
+        self.assertEqual(old_blob.ref_count, 1)
+        assert_blobs_referenced(self)
+
+        # The same content again is not a change.
+        self.generate_variants.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = common_m.Photo.objects.get(pk=photo.pk)
+            photo.photo = ContentFile(buffer.getvalue(), name="again.png")
+            photo.save()
+        self.generate_variants.assert_not_called()
+        self.assertEqual(common_m.Blob.objects.count(), 2)
+        assert_blobs_referenced(self)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertFalse(common_m.Blob.objects.filter(pk=old_blob.pk).exists())
+
+    def test_deduplicate_media(self):
+        photos = [self.create_photo() for _ in range(2)]
+        storage = photos[0].photo.storage
+        legacy_names = [
+            storage.save("photos/Poster/legacy.png", photo.photo) for photo in photos
+        ]
+        for photo, name in zip(photos, legacy_names):
+            common_m.Photo.objects.filter(pk=photo.pk).update(blob=None, photo=name)
+        common_m.Blob.objects.update(ref_count=0)
+
+        out = StringIO()
+        call_command("deduplicate_media", stdout=out)
+        self.assertIn("Photos: 2 files deduplicated", out.getvalue())
+        blob = common_m.Blob.objects.get()
+        self.assertEqual(
+            [photo.photo.name for photo in common_m.Photo.objects.all()],
+            [blob.name] * 2,
+        )
+        assert_blobs_referenced(self)
+        for name in legacy_names:
+            self.assertFalse(storage.exists(name))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA)
+class TestVideoUploads(APITestCase):
+    def setUp(self):
+        self.user = users_m.User.objects.create_user(
+            email="email@gmail.com",
+            username="username",
+            password="password",
+            is_staff=True,
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.movie = catalog_m.Movie.objects.create(title="Test Movie")
+        with open("medialibrary/utils/test_data/video.mp4", "rb") as f:
+            self.content = f.read()
+
+        patcher = mock.patch.object(common_t.generate_video_preview, "delay")
+        self.generate_preview = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(common_t.transcode_video_hls, "delay")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(common_t.finalize_video_upload, "delay")
+        self.finalize_upload = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_upload(self, **data):
+        data = {
+            "filename": "trailer.mp4",
+            "size": len(self.content),
+            "type": common_c.VIDEO_TYPE_TRAILER,
+            "movie": self.movie.pk,
+            **data,
+        }
+        return self.client.post("/api/common/video/uploads/", data, format="json")
+
+    def finalize(self, upload_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f"/api/common/video/uploads/{upload_id}/finalize/")
+
+    def send_chunk(self, upload_id, offset, chunk):
+        return self.client.patch(
+            f"/api/common/video/uploads/{upload_id}/",
+            chunk,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_resumable_upload(self):
+        response = self.create_upload()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["offset"], 0)
+        upload_id = response.data["id"]
+
+        half = len(self.content) // 2
+        response = self.send_chunk(upload_id, 0, self.content[:half])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Upload-Offset"], str(half))
+
+        # A retried chunk the server already stored.
+        response = self.send_chunk(upload_id, 0, self.content[:half])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response["Upload-Offset"], str(half))
+
+        response = self.client.head(f"/api/common/video/uploads/{upload_id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Upload-Offset"], str(half))
+        self.assertEqual(response["Upload-Length"], str(len(self.content)))
+
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.send_chunk(upload_id, half, self.content[half:] + b"extra")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.send_chunk(upload_id, half, self.content[half:])
+        self.assertEqual(response.data["offset"], len(self.content))
+
+        parts = common_m.VideoUpload.objects.get(pk=upload_id).parts
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], common_c.VIDEO_UPLOAD_STATUS_QUEUED)
+        self.finalize_upload.assert_called_once_with(uuid.UUID(upload_id))
+        # Nothing more can be sent, or finalized twice.
+        response = self.send_chunk(upload_id, len(self.content), b"x")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            common_t.finalize_video_upload(upload_id)
+        response = self.client.get(f"/api/common/video/uploads/{upload_id}/")
+        self.assertEqual(response.data["status"], common_c.VIDEO_UPLOAD_STATUS_COMPLETE)
+
+        video = common_m.Video.objects.get(pk=response.data["video"])
+        self.assertEqual((video.user, video.movie), (self.user, self.movie))
+        with video.video.open("rb"):
+            self.assertEqual(video.video.read(), self.content)
+        self.assertEqual(video.blob.sha256, hashlib.sha256(self.content).hexdigest())
+        self.generate_preview.assert_called_once_with(video.pk, video.video.name)
+        for name in parts:
+            self.assertFalse(video.video.storage.exists(name))
+        assert_blobs_referenced(self)
+
+        # A second delivery of the task does nothing.
+        common_t.finalize_video_upload(upload_id)
+        self.assertEqual(common_m.Video.objects.count(), 1)
+
+    def test_finalize_failed(self):
+        upload_id = self.create_upload().data["id"]
+        self.send_chunk(upload_id, 0, self.content)
+        self.finalize(upload_id)
+
+        with (
+            mock.patch.object(
+                common_m.VideoUpload, "create_video", side_effect=OSError("Timeout")
+            ),
+            self.assertLogs(common_t.logger, "ERROR"),
+        ):
+            common_t.finalize_video_upload(upload_id)
+        upload = common_m.VideoUpload.objects.get(pk=upload_id)
+        self.assertEqual(upload.status, common_c.VIDEO_UPLOAD_STATUS_FAILED)
+        self.assertEqual(len(upload.parts), 1)
+
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_create_upload_validation(self):
+        response = self.create_upload(filename="trailer.exe")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("filename", response.data)
+
+        series = catalog_m.Series.objects.create(title="Test Series")
+        response = self.create_upload(series=series.pk)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.create_upload(size=0)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_owner_only(self):
+        upload_id = self.create_upload().data["id"]
+
+        other = users_m.User.objects.create_user(
+            email="other@gmail.com",
+            username="other",
+            password="password",
+            is_staff=True,
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=other).key}"
+        )
+        response = self.send_chunk(upload_id, 0, self.content)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        other.is_staff = False
+        other.save()
+        response = self.create_upload()
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials()
+        response = self.create_upload()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_delete_upload(self):
+        upload_id = self.create_upload().data["id"]
+        self.send_chunk(upload_id, 0, self.content[:100])
+        parts = common_m.VideoUpload.objects.get(pk=upload_id).parts
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/api/common/video/uploads/{upload_id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        storage = common_m.Video._meta.get_field("video").storage
+        self.assertFalse(storage.exists(parts[0]))
+
+    def test_delete_expired_uploads(self):
+        upload_id = self.create_upload().data["id"]
+        self.send_chunk(upload_id, 0, self.content[:100])
+        parts = common_m.VideoUpload.objects.get(pk=upload_id).parts
+        storage = common_m.Video._meta.get_field("video").storage
+
+        common_t.delete_expired_video_uploads()
+        self.assertTrue(storage.exists(parts[0]))
+
+        common_m.VideoUpload.objects.filter(pk=upload_id).update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        common_t.delete_expired_video_uploads()
+        self.assertFalse(common_m.VideoUpload.objects.exists())
+        self.assertFalse(storage.exists(parts[0]))
+
+
+@skipUnless(mock_aws, "moto is not installed")
+class TestDirectUploads(APITestCase):
+    def setUp(self):
+        self.user = users_m.User.objects.create_user(
+            email="email@gmail.com",
+            username="username",
+            password="password",
+            is_staff=True,
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.movie = catalog_m.Movie.objects.create(title="Test Movie")
+        buffer = BytesIO()
+        Image.new("RGB", (32, 48), "red").save(buffer, "JPEG")
+        self.content = buffer.getvalue()
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+
+        for task in (
+            common_t.generate_photo_variants,
+            common_t.generate_video_preview,
+            common_t.transcode_video_hls,
+        ):
+            patcher = mock.patch.object(task, "delay")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # The storage is created lazily, so it connects to the mocked S3.
+        self.enterContext(mock_aws())
+        self.enterContext(
+            override_settings(
+                STORAGES={
+                    **settings.STORAGES,
+                    "default": {"BACKEND": "storages.backends.s3.S3Storage"},
+                },
+                AWS_STORAGE_BUCKET_NAME="media-bucket",
+                AWS_S3_REGION_NAME="us-east-1",
+                AWS_ACCESS_KEY_ID="testing",
+                AWS_SECRET_ACCESS_KEY="testing",
+            )
+        )
+        default_storage.bucket.create()
+
+    def get_data(self, **data):
+        return {
+            "kind": "photo",
+            "filename": "poster.JPG",
+            "size": len(self.content),
+            "sha256": self.sha256,
+            **data,
+        }
+
+    def request_upload(self, **data):
+        return self.client.post(
+            "/api/common/direct-uploads/", self.get_data(**data), format="json"
+        )
+
+    def finalize(self, **data):
+        data = {"type": common_c.PHOTO_TYPE_POSTER, "movie": self.movie.pk, **data}
+        return self.client.post(
+            "/api/common/direct-uploads/finalize/",
+            self.get_data(**data),
+            format="json",
+        )
+
+    def test_direct_upload(self):
+        response = self.request_upload()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        key = f"photos/{self.sha256[:2]}/{self.sha256}.jpg"
+        self.assertEqual(response.data["key"], key)
+        self.assertFalse(response.data["exists"])
+        self.assertEqual(response.data["method"], "PUT")
+
+        upload = requests.put(
+            response.data["url"], data=self.content, headers=response.data["headers"]
+        )
+        self.assertEqual(upload.status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.finalize()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        photo = common_m.Photo.objects.get(pk=response.data["id"])
+        self.assertEqual(photo.photo.name, key)
+        self.assertEqual(photo.user, self.user)
+        self.assertEqual(photo.movie, self.movie)
+        self.assertEqual(photo.blob.sha256, self.sha256)
+        common_t.generate_photo_variants.delay.assert_called_once_with(
+            photo.pk, key, []
+        )
+        assert_blobs_referenced(self)
+
+    def test_stored_content_not_uploaded_again(self):
+        response = self.request_upload()
+        requests.put(
+            response.data["url"], data=self.content, headers=response.data["headers"]
+        )
+        first = self.finalize().data["id"]
+
+        response = self.request_upload(filename="other.jpeg")
+        self.assertTrue(response.data["exists"])
+        self.assertIsNone(response.data["url"])
+        second = self.finalize(filename="other.jpeg").data["id"]
+
+        photos = common_m.Photo.objects.filter(pk__in=[first, second])
+        self.assertEqual(len({photo.blob_id for photo in photos}), 1)
+        self.assertEqual(photos[0].blob.ref_count, 2)
+        assert_blobs_referenced(self)
+
+    def upload(self, content, **data):
+        sha256 = hashlib.sha256(content).hexdigest()
+        response = self.request_upload(size=len(content), sha256=sha256, **data)
+        requests.put(
+            response.data["url"], data=content, headers=response.data["headers"]
+        )
+        return {"size": len(content), "sha256": sha256, **data}
+
+    def test_mismatched_upload_rejected(self):
+        response = self.request_upload()
+        requests.put(
+            response.data["url"],
+            data=self.content[:-1],
+            headers=response.data["headers"],
+        )
+
+        response = self.finalize()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(common_m.Photo.objects.exists())
+        self.assertFalse(common_m.Blob.objects.exists())
+
+    def test_wrong_claim_keeps_upload(self):
+        self.upload(self.content)
+
+        # Someone else claiming the content with another size.
+        response = self.finalize(size=len(self.content) + 1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(default_storage.exists(self.request_upload().data["key"]))
+
+        response = self.finalize()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_invalid_content_rejected(self):
+        data = self.upload(b"not an image")
+        response = self.finalize(**data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data = self.upload(self.content, kind="video", filename="trailer.mp4")
+        response = self.finalize(type=common_c.VIDEO_TYPE_TRAILER, **data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with open("medialibrary/utils/test_data/video.mp4", "rb") as f:
+            data = self.upload(f.read(), kind="video", filename="trailer.mp4")
+        response = self.finalize(type=common_c.VIDEO_TYPE_TRAILER, **data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(common_m.Photo.objects.exists())
+        assert_blobs_referenced(self)
+
+    def test_missing_upload_rejected(self):
+        response = self.finalize()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(common_m.Photo.objects.exists())
+
+    def test_invalid_requests(self):
+        response = self.request_upload(filename="poster.exe")
+        self.assertIn("filename", response.data)
+        response = self.request_upload(size=settings.PHOTO_UPLOAD_MAX_SIZE + 1)
+        self.assertIn("size", response.data)
+        response = self.request_upload(sha256="not a digest")
+        self.assertIn("sha256", response.data)
+
+        response = self.finalize(type=common_c.VIDEO_TYPE_TRAILER + 100)
+        self.assertIn("type", response.data)
+        response = self.finalize(
+            kind="video",
+            filename="trailer.mp4",
+            type=common_c.VIDEO_TYPE_TRAILER,
+            movie=None,
+        )
+        self.assertIn("non_field_errors", response.data)
+
+    def test_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.request_upload()
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.finalize()
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_requires_s3_storage(self):
+        with override_settings(
+            STORAGES={
+                **settings.STORAGES,
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            }
+        ):
+            response = self.request_upload()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA)
+class TestVideoStream(APITestCase):
+    def setUp(self):
+        movie = catalog_m.Movie.objects.create(title="Test Movie")
+        with open("medialibrary/utils/test_data/video.mp4", "rb") as f:
+            self.content = f.read()
+            self.video = common_m.Video.objects.create(
+                video=File(f), type=common_c.VIDEO_TYPE_TRAILER, movie=movie
+            )
+        self.url = f"/api/common/video/{self.video.pk}/stream/"
+        self.etag = f'"{self.video.blob.sha256}"'
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        if response.streaming:
+            # Consuming the content closes the file.
+            return response, b"".join(response.streaming_content)
+        return response, response.content
+
+    def test_blob_not_exposed(self):
+        response = self.client.get(f"/api/common/video/{self.video.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(self.video.blob_id)
+        self.assertNotIn("blob", response.data)
+        self.assertNotIn("blob", common_s.PhotoSerializer().fields)
+
+    def test_whole_file(self):
+        response, content = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(int(response["Content-Length"]), len(self.content))
+        self.assertEqual(content, self.content)
+
+    def test_byte_ranges(self):
+        size = len(self.content)
+        for header, start, end in (
+            ("bytes=100-199", 100, 199),
+            ("bytes=1000-", 1000, size - 1),
+            ("bytes=-10", size - 10, size - 1),
+            (f"bytes=0-{size * 2}", 0, size - 1),
+        ):
+            with self.subTest(header):
+                response, content = self.get(Range=header)
+                self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+                self.assertEqual(
+                    response["Content-Range"], f"bytes {start}-{end}/{size}"
+                )
+                stop = end + 1
+                self.assertEqual(int(response["Content-Length"]), stop - start)
+                self.assertEqual(content, self.content[start:stop])
+
+    def test_unsupported_ranges_serve_whole_file(self):
+        for header in ("bytes=0-1,5-9", "bytes=20-10", "items=0-1"):
+            with self.subTest(header):
+                response, content = self.get(Range=header)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(content, self.content)
+
+    def test_unsatisfiable_range(self):
+        response, content = self.get(Range=f"bytes={len(self.content)}-")
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+    def test_if_range(self):
+        response, content = self.get(Range="bytes=0-9", **{"If-Range": self.etag})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        response, content = self.get(
+            Range="bytes=0-9", **{"If-Range": response["Last-Modified"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+        # The file changed since the client's copy, which is sent again.
+        response, content = self.get(Range="bytes=0-9", **{"If-Range": '"outdated"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content, self.content)
+
+    def test_not_modified(self):
+        response, content = self.get(**{"If-None-Match": self.etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_remote_storage_redirects(self):
+        with mock.patch.object(
+            FieldFile, "path", new_callable=mock.PropertyMock
+        ) as path:
+            path.side_effect = NotImplementedError
+            response, content = self.get()
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(response["Location"], self.video.video.url)
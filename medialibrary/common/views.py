@@ -1,9 +1,29 @@
-from rest_framework import permissions
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponseRedirect
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
+from rest_framework import mixins, permissions, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
 from rest_framework.routers import DefaultRouter
 
+import medialibrary.common.constants as common_c
+import medialibrary.common.direct_uploads as common_du
 import medialibrary.common.models as common_m
 import medialibrary.common.serializers as common_s
+import medialibrary.common.tasks as common_t
 from medialibrary.utils.base_views import BaseViewSet
+from medialibrary.utils.responses import ranged_file_response
+
+
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_code = "conflict"
 
 
 class PhotoVS(BaseViewSet):
@@ -23,11 +43,279 @@ class VideoVS(BaseViewSet):
     action_permissions = {
         "list": permissions.AllowAny,
         "retrieve": permissions.AllowAny,
+        "stream": permissions.AllowAny,
     }
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Range",
+                OpenApiTypes.STR,
+                OpenApiParameter.HEADER,
+                description="A single byte range, e.g. `bytes=0-1048575`",
+            )
+        ],
+        responses={
+            (200, "application/octet-stream"): OpenApiTypes.BINARY,
+            (206, "application/octet-stream"): OpenApiTypes.BINARY,
+        },
+    )
+    @action(detail=True, methods=["get"])
+    def stream(self, request, pk=None):
+        """
+        Serves the video file, or the byte range requested with `Range`, so
+        players can seek without downloading the whole file. Videos in remote
+        storage are redirected to, which serves ranges itself.
+        """
+        video = self.get_object()
+        file = video.video
+        try:
+            path = file.path
+        except NotImplementedError:
+            return HttpResponseRedirect(file.url)
+
+        size = file.size
+        last_modified = file.storage.get_modified_time(file.name)
+        if video.blob_id is not None:
+            etag = video.blob.sha256
+        else:
+            etag = f"{size:x}-{int(last_modified.timestamp()):x}"
+        return ranged_file_response(request, path, size, etag, last_modified)
+
+
+class VideoUploadVS(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Resumable video uploads: create an upload with the file's size, send the
+    bytes with `PATCH` requests carrying the current `Upload-Offset`, resume
+    from the offset returned by `GET`/`HEAD` after a failure, then `finalize`
+    to queue the creation of the video. The upload's `video` is set once its
+    `status` is complete. Staff only, as the videos attach to catalog items.
+    """
+
+    queryset = common_m.VideoUpload.objects.all()
+    serializer_class = common_s.VideoUploadSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def get_locked_object(self):
+        # Serializes concurrent requests for the same upload.
+        return get_object_or_404(
+            self.get_queryset().select_for_update(), pk=self.kwargs["pk"]
+        )
+
+    def get_upload_headers(self, upload):
+        return {
+            "Upload-Offset": str(upload.offset),
+            "Upload-Length": str(upload.size),
+            "Cache-Control": "no-store",
+        }
+
+    def retrieve(self, request, *args, **kwargs):
+        upload = self.get_object()
+        return Response(
+            self.get_serializer(upload).data, headers=self.get_upload_headers(upload)
+        )
+
+    @extend_schema(
+        request={"application/offset+octet-stream": OpenApiTypes.BINARY},
+        parameters=[
+            OpenApiParameter(
+                "Upload-Offset",
+                OpenApiTypes.INT,
+                OpenApiParameter.HEADER,
+                required=True,
+                description="Bytes of the file received so far",
+            )
+        ],
+    )
+    def partial_update(self, request, *args, **kwargs):
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            raise ValidationError(
+                "Upload-Offset and Content-Length headers are required."
+            )
+
+        with transaction.atomic():
+            upload = self.get_locked_object()
+            self.check_uploading(upload)
+            if offset != upload.offset:
+                return Response(
+                    {"detail": "Upload-Offset doesn't match the upload."},
+                    status=status.HTTP_409_CONFLICT,
+                    headers=self.get_upload_headers(upload),
+                )
+            if length > upload.size - upload.offset:
+                raise ValidationError("The chunk exceeds the upload size.")
+
+            if length:
+                upload.append(request.stream, length)
+            upload.save(update_fields=["offset", "parts", "updated_at"])
+        return Response(
+            self.get_serializer(upload).data, headers=self.get_upload_headers(upload)
+        )
+
+    def check_uploading(self, upload):
+        if upload.status not in (
+            common_c.VIDEO_UPLOAD_STATUS_UPLOADING,
+            common_c.VIDEO_UPLOAD_STATUS_FAILED,
+        ):
+            raise Conflict(f"The upload is {upload.get_status_display().lower()}.")
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            upload = self.get_locked_object()
+            if upload.status != common_c.VIDEO_UPLOAD_STATUS_COMPLETE:
+                self.check_uploading(upload)
+            upload.delete()
+            transaction.on_commit(upload.delete_parts)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(request=None, responses={202: common_s.VideoUploadSerializer})
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        with transaction.atomic():
+            upload = self.get_locked_object()
+            self.check_uploading(upload)
+            if upload.offset != upload.size:
+                raise ValidationError(
+                    f"The upload is incomplete, {upload.offset} of {upload.size} "
+                    "bytes received."
+                )
+
+            # Joining, hashing and storing gigabytes is left to a worker.
+            upload.status = common_c.VIDEO_UPLOAD_STATUS_QUEUED
+            upload.save(update_fields=["status", "updated_at"])
+            transaction.on_commit(
+                partial(common_t.finalize_video_upload.delay, upload.pk)
+            )
+
+        return Response(
+            self.get_serializer(upload).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers=self.get_upload_headers(upload),
+        )
+
+
+class DirectUploadVS(viewsets.GenericViewSet):
+    """
+    Uploads straight to the storage bucket: `create` returns a presigned URL
+    for a `PUT` of the file with the headers to send along, then `finalize`
+    checks the stored object and creates the photo or video. Staff only: a
+    known SHA-256 is finalized without its content being sent.
+    """
+
+    serializer_class = common_s.DirectUploadSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_serializer_class(self):
+        if self.action == "finalize":
+            return common_s.DirectUploadFinalizeSerializer
+        return super().get_serializer_class()
+
+    def get_storage(self):
+        storage = common_du.get_storage()
+        if storage is None:
+            raise ValidationError("Direct uploads require S3 storage.")
+        return storage
+
+    @extend_schema(
+        responses=inline_serializer(
+            "DirectUploadURL",
+            {
+                "key": serializers.CharField(),
+                "exists": serializers.BooleanField(),
+                "url": serializers.URLField(allow_null=True),
+                "method": serializers.CharField(),
+                "headers": serializers.DictField(child=serializers.CharField()),
+                "expires_in": serializers.IntegerField(),
+            },
+        )
+    )
+    def create(self, request):
+        storage = self.get_storage()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # Content stored already needn't be sent again.
+        exists = common_m.Blob.objects.filter(sha256=data["sha256"]).exists()
+        url, headers = None, {}
+        if not exists:
+            url, headers = common_du.presign_put(
+                storage, data["name"], data["size"], data["sha256"]
+            )
+        return Response(
+            {
+                "key": data["name"],
+                "exists": exists,
+                "url": url,
+                "method": "PUT",
+                "headers": headers,
+                "expires_in": settings.DIRECT_UPLOAD_EXPIRATION,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(responses=common_s.VideoSerializer)
+    @action(detail=False, methods=["post"])
+    def finalize(self, request):
+        storage = self.get_storage()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        model = data["model"]
+        blob = common_m.Blob.objects.filter(sha256=data["sha256"]).first()
+        name = blob.name if blob else data["name"]
+        if blob is None:
+            stored = common_du.head_object(storage, name)
+            if stored is None:
+                raise ValidationError("The file hasn't been uploaded.")
+            # Not deleted on a mismatch: the key is content-addressed, so it may
+            # hold another user's upload that a wrong claim doesn't describe.
+            if stored != (data["size"], common_du.get_checksum(data["sha256"])):
+                raise ValidationError("The uploaded file doesn't match.")
+        if blob is None or not blob.name.startswith(f"{model.blob_prefix}/"):
+            if not common_du.has_valid_content(storage, name, data["kind"]):
+                raise ValidationError(f"The uploaded file isn't a {data['kind']}.")
+
+        with transaction.atomic():
+            blob = common_m.Blob.objects.reference(data["sha256"], name, data["size"])
+            item = model.objects.create(
+                user=request.user,
+                type=data["type"],
+                movie=data.get("movie"),
+                series=data.get("series"),
+                game=data.get("game"),
+                blob=blob,
+                **{model.blob_file_field: blob.name},
+            )
+
+        serializer_class = {
+            common_m.Photo: common_s.PhotoSerializer,
+            common_m.Video: common_s.VideoSerializer,
+        }[model]
+        serializer = serializer_class(item, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 router = DefaultRouter()
 router.register("photo", PhotoVS)
+# Before "video", whose detail route would match "video/uploads/".
+router.register("video/uploads", VideoUploadVS)
 router.register("video", VideoVS)
+router.register("direct-uploads", DirectUploadVS, basename="direct-upload")
 
 common_urls = router.urls
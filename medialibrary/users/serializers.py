@@ -73,8 +73,40 @@ class UserRequestPasswordResetSerializer(serializers.Serializer):
         return data
 
 
+# Compact media in collection lists are shared across requests, and ratings
+# change without touching the media row, so they leave the rating out.
+COLLECTION_MEDIA_FIELDS = tuple(
+    name for name in catalog_s.MediaListSerializer.Meta.fields if name != "rating"
+)
+
+
+class CollectionMovieSerializer(catalog_s.MovieListSerializer):
+    rating = None
+
+    class Meta(catalog_s.MovieListSerializer.Meta):
+        fields = COLLECTION_MEDIA_FIELDS
+
+
+class CollectionSeriesSerializer(catalog_s.SeriesListSerializer):
+    rating = None
+
+    class Meta(catalog_s.SeriesListSerializer.Meta):
+        fields = COLLECTION_MEDIA_FIELDS
+
+
+class CollectionGameSerializer(catalog_s.GameListSerializer):
+    rating = None
+
+    class Meta(catalog_s.GameListSerializer.Meta):
+        fields = COLLECTION_MEDIA_FIELDS
+
+
 class UserMovieCollectionSerializer(serializers.ModelSerializer):
-    movie = ReadablePKRF(catalog_s.MovieSerializer)
+    movie = ReadablePKRF(
+        catalog_s.MovieSerializer,
+        list_serializer=CollectionMovieSerializer,
+        cache_timeout=60 * 5,
+    )
 
     class Meta:
         model = users_m.UserMovieCollection
@@ -83,7 +115,11 @@ class UserMovieCollectionSerializer(serializers.ModelSerializer):
 
 
 class UserSeriesCollectionSerializer(serializers.ModelSerializer):
-    series = ReadablePKRF(catalog_s.SeriesSerializer)
+    series = ReadablePKRF(
+        catalog_s.SeriesSerializer,
+        list_serializer=CollectionSeriesSerializer,
+        cache_timeout=60 * 5,
+    )
 
     class Meta:
         model = users_m.UserSeriesCollection
@@ -92,7 +128,11 @@ class UserSeriesCollectionSerializer(serializers.ModelSerializer):
 
 
 class UserGameCollectionSerializer(serializers.ModelSerializer):
-    game = ReadablePKRF(catalog_s.GameSerializer)
+    game = ReadablePKRF(
+        catalog_s.GameSerializer,
+        list_serializer=CollectionGameSerializer,
+        cache_timeout=60 * 5,
+    )
 
     class Meta:
         model = users_m.UserGameCollection
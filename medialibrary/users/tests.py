@@ -2,6 +2,7 @@ import tempfile
 import uuid
 from datetime import timedelta
 from random import choice, sample
+from unittest import mock
 
 from django.core import mail
 from django.core.cache import cache
@@ -12,10 +13,13 @@ from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient, APITestCase
 
 import medialibrary.catalog.models as catalog_m
+import medialibrary.catalog.serializers as catalog_s
 import medialibrary.common.constants as common_c
 import medialibrary.common.models as common_m
+import medialibrary.common.tasks as common_t
 import medialibrary.users.constants as users_c
 import medialibrary.users.models as users_m
+import medialibrary.users.serializers as users_s
 
 
 class UserVSTestCase(APITestCase):
@@ -446,8 +450,98 @@ class TestUserMovieCollectionVS(APITestCase):
 
     def test_queries(self):
         # 2 - select movies_collections with pagination
-        # 2 - select photo, videos
-        # 3 - select movies, staff, genres
-        with self.assertNumQueries(7):
+        # 1 - select movies with poster
+        # 1 - select genres into the cache
+        with self.assertNumQueries(4):
             response = self.client.get("/api/users/movie_collection/")
             self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def render_compact_movies(self, *collections):
+        return [
+            collection["movie"]
+            for collection in users_s.UserMovieCollectionSerializer(
+                collections, many=True
+            ).data
+        ]
+
+    def test_movie_rendered_once_per_response(self):
+        cache.clear()
+        to_representation = catalog_s.MovieListSerializer.to_representation
+        with mock.patch.object(
+            catalog_s.MovieListSerializer,
+            "to_representation",
+            autospec=True,
+            side_effect=to_representation,
+        ) as mocked:
+            first, second = self.render_compact_movies(
+                self.movie_collection, self.movie_collection
+            )
+        self.assertEqual(first, second)
+        self.assertEqual(mocked.call_count, 1)
+
+    def test_compact_movie_cached_across_requests(self):
+        cache.clear()
+        genre = self.genres[0]
+        with open("medialibrary/utils/test_data/photo.png", "rb") as f:
+            poster = common_m.Photo.objects.create(
+                photo=File(f), type=common_c.PHOTO_TYPE_POSTER
+            )
+        self.movie.poster = poster
+        self.movie.save()
+
+        def render():
+            collection = users_m.UserMovieCollection.objects.select_related(
+                "movie"
+            ).get(pk=self.movie_collection.pk)
+            return self.render_compact_movies(collection)[0]
+
+        self.assertEqual(render()["genres"], [])
+        with self.assertNumQueries(1):
+            # The collection only, the movie is served from the cache.
+            render()
+
+        # None of these writes touches the movie row's `updated_at`.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.genres.add(genre)
+        self.assertEqual(render()["genres"], [genre.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            genre.name = "renamed"
+            genre.save()
+        self.assertEqual(render()["genre_names"], ["renamed"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            common_t.generate_photo_variants(poster.pk, poster.photo.name)
+        self.assertIn("webp", render()["poster_srcset"])
+
+    def test_retrieve_movie_not_shared(self):
+        cache.clear()
+        url = f"/api/users/movie_collection/{self.movie_collection.pk}/"
+        response = self.client.get(url)
+        self.assertEqual(response.data["movie"]["rating"], 0.0)
+        self.assertEqual(response.data["movie"]["movie_staff"], [])
+
+        # Neither write touches the movie row's `updated_at`.
+        catalog_m.MovieRating.objects.create(movie=self.movie, user=self.user, rating=8)
+        staff = catalog_m.Staff.objects.create(
+            person=self.persons[0], movie=self.movie, role=self.staff_roles[0]
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.data["movie"]["rating"], 8.0)
+        self.assertEqual(
+            [item["id"] for item in response.data["movie"]["movie_staff"]], [staff.pk]
+        )
+
+    def test_list_movies_collections_compact_movie(self):
+        response = self.client.get("/api/users/movie_collection/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        movie = response.data["results"][0]["movie"]
+        self.assertEqual(
+            set(movie),
+            {"id", "title", "year", "poster", "poster_srcset", "genres", "genre_names"},
+        )
+
+        response = self.client.get(
+            f"/api/users/movie_collection/{self.movie_collection.pk}/"
+        )
+        self.assertIn("movie_staff", response.data["movie"])
@@ -15,6 +15,7 @@ from rest_framework.response import Response
 from rest_framework.routers import DefaultRouter
 
 import medialibrary.catalog.models as catalog_m
+import medialibrary.catalog.serializers as catalog_s
 import medialibrary.common.models as common_m
 import medialibrary.users.filters as users_f
 import medialibrary.users.models as users_m
@@ -181,22 +182,29 @@ class UserMovieCollectionVS(
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            return qs.prefetch_related(
+                Prefetch(
+                    "movie",
+                    queryset=users_s.CollectionMovieSerializer.setup_eager_loading(
+                        catalog_m.Movie.objects.all()
+                    ),
+                )
+            )
         return qs.prefetch_related(
             Prefetch(
                 "movie",
-                queryset=catalog_m.Movie.objects.all()
-                .select_related("poster", "company")
+                queryset=catalog_m.Movie.objects.annotate(
+                    rating=catalog_m.media_rating()
+                )
+                .select_related("poster")
                 .prefetch_related(
                     "photos",
-                    "genres",
                     Prefetch(
                         "videos",
                         queryset=common_m.Video.objects.all().select_related("preview"),
                     ),
-                    Prefetch(
-                        "movie_staff",
-                        queryset=catalog_m.Staff.objects.all().select_related("person"),
-                    ),
+                    catalog_s.TopBilledStaffListSerializer.prefetch("movie_staff"),
                 ),
             ),
         )
@@ -235,22 +243,29 @@ class UserSeriesCollectionVS(
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            return qs.prefetch_related(
+                Prefetch(
+                    "series",
+                    queryset=users_s.CollectionSeriesSerializer.setup_eager_loading(
+                        catalog_m.Series.objects.all()
+                    ),
+                )
+            )
         return qs.prefetch_related(
             Prefetch(
                 "series",
-                queryset=catalog_m.Series.objects.all()
-                .select_related("poster", "company")
+                queryset=catalog_m.Series.objects.annotate(
+                    rating=catalog_m.media_rating()
+                )
+                .select_related("poster")
                 .prefetch_related(
                     "photos",
-                    "genres",
                     Prefetch(
                         "videos",
                         queryset=common_m.Video.objects.all().select_related("preview"),
                     ),
-                    Prefetch(
-                        "series_staff",
-                        queryset=catalog_m.Staff.objects.all().select_related("person"),
-                    ),
+                    catalog_s.TopBilledStaffListSerializer.prefetch("series_staff"),
                 ),
             ),
         )
@@ -289,14 +304,24 @@ class UserGameCollectionVS(
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            return qs.prefetch_related(
+                Prefetch(
+                    "game",
+                    queryset=users_s.CollectionGameSerializer.setup_eager_loading(
+                        catalog_m.Game.objects.all()
+                    ),
+                )
+            )
         return qs.prefetch_related(
             Prefetch(
                 "game",
-                queryset=catalog_m.Game.objects.all()
-                .select_related("poster", "company")
+                queryset=catalog_m.Game.objects.annotate(
+                    rating=catalog_m.media_rating()
+                )
+                .select_related("poster")
                 .prefetch_related(
                     "photos",
-                    "genres",
                     Prefetch(
                         "videos",
                         queryset=common_m.Video.objects.all().select_related("preview"),
@@ -1,8 +1,15 @@
 import inspect
 
+from django.db.models import Prefetch
 from django_filters import rest_framework as filters
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import mixins, permissions, viewsets
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from medialibrary.utils.drf import IdsSerializer, get_sparse_fieldsets
 
 
 class DynamicResultsSetPagination(PageNumberPagination):
@@ -11,6 +18,13 @@ class DynamicResultsSetPagination(PageNumberPagination):
     max_page_size = 200
 
 
+class DynamicCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = "-id"
+
+
 class ActionBasedPermission(permissions.IsAuthenticated):
     def has_permission(self, request, view):
         custom_permission = getattr(view, "action_permissions", {}).get(view.action)
@@ -34,3 +48,102 @@ class BaseViewSet(
         context = super().get_serializer_context()
         context.update({"request": self.request})
         return context
+
+
+class DynamicFieldsQuerysetMixin:
+    """
+    Applies only the joins needed for the fields requested with `?fields=` and
+    `?expand=`, see `DynamicFieldsMixin`.
+
+    `select_related_fields` lists forward relations, `prefetch_related_fields`
+    maps a serializer field to its prefetch lookup. Collapsed many relations are
+    prefetched by name only, as their primary keys are still rendered, unless
+    the lookup stores a limited list in `to_attr` for the field to read.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = {}
+
+    def is_sparse_request(self):
+        requested, expand = get_sparse_fieldsets(self.request)
+        return requested is not None or expand is not None
+
+    def is_field_requested(self, name):
+        requested, _ = get_sparse_fieldsets(self.request)
+        return requested is None or name in requested
+
+    def is_field_expanded(self, name):
+        _, expand = get_sparse_fieldsets(self.request)
+        if not self.is_field_requested(name):
+            return False
+        return not self.is_sparse_request() or name in (expand or set())
+
+    def optimize_queryset(self, qs):
+        select_related = [
+            name for name in self.select_related_fields if self.is_field_expanded(name)
+        ]
+        prefetch_related = []
+        for name, lookup in self.prefetch_related_fields.items():
+            if self.is_field_expanded(name):
+                prefetch_related.append(lookup)
+            elif self.is_field_requested(name):
+                if isinstance(lookup, Prefetch) and lookup.to_attr:
+                    prefetch_related.append(lookup)
+                else:
+                    prefetch_related.append(name)
+
+        if select_related:
+            qs = qs.select_related(*select_related)
+        if prefetch_related:
+            qs = qs.prefetch_related(*prefetch_related)
+        return qs
+
+
+class BulkRetrieveMixin:
+    """
+    Adds a `bulk` action returning the items with the ids passed as
+    `?ids=1,2,3`, or as `{"ids": [1, 2, 3]}` in a POST body for long lists,
+    in the requested order. Unknown ids are skipped.
+    """
+
+    bulk_limit = 200
+
+    def get_bulk_ids(self, request):
+        if request.method == "POST":
+            data = request.data
+        else:
+            value = request.query_params.get("ids", "")
+            data = {"ids": [item.strip() for item in value.split(",") if item.strip()]}
+
+        serializer = IdsSerializer(data=data, context={"limit": self.bulk_limit})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data["ids"]
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "bulk":
+            kwargs.setdefault("many", True)
+        return super().get_serializer(*args, **kwargs)
+
+    @extend_schema(
+        summary="Retrieve many items by id",
+        description="Returns the items in the requested order, skipping unknown ids.",
+        parameters=[
+            OpenApiParameter(
+                name="ids",
+                type=OpenApiTypes.STR,
+                description="Comma separated ids, for GET requests",
+            )
+        ],
+        request=IdsSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["get", "post"],
+        pagination_class=None,
+        filter_backends=[],
+    )
+    def bulk(self, request, *args, **kwargs):
+        ids = self.get_bulk_ids(request)
+        items = {item.pk: item for item in self.get_queryset().filter(pk__in=ids)}
+        serializer = self.get_serializer([items[pk] for pk in ids if pk in items])
+        return Response(serializer.data)
@@ -0,0 +1,103 @@
+from time import monotonic, time_ns
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_version(key):
+    # A missing key starts from a fresh value, so copies loaded before the
+    # key was evicted are not mistaken for current ones.
+    return cache.get_or_set(key, time_ns, timeout=None)
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time_ns(), timeout=None)
+
+
+class ReferenceCache:
+    """
+    Process-local copy of a small, rarely written table, keyed by primary key.
+
+    Every process keeps its own copy next to the version it was loaded at. The
+    version lives in the shared cache (Redis in production) and is bumped by
+    `invalidate()` on commit, so writes in one process reload the table
+    everywhere. The shared version is checked at most once per
+    `REFERENCE_CACHE_CHECK_INTERVAL` seconds; the writing process drops its
+    copy immediately.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f"reference_cache:{model.lower()}:version"
+        self.objects = None
+        self.version = None
+        self.checked_at = None
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per serializer instance, and every
+        # copy must share the process-wide state.
+        return self
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def get_version(self):
+        return get_version(self.version_key)
+
+    def is_stale(self, check=False):
+        """
+        Compares the shared version at most once per interval, or right away
+        if `check` is set.
+        """
+        if self.objects is None:
+            return True
+
+        now = monotonic()
+        if (
+            not check
+            and now - self.checked_at < settings.REFERENCE_CACHE_CHECK_INTERVAL
+        ):
+            return False
+        self.checked_at = now
+        return self.get_version() != self.version
+
+    def load(self):
+        version = self.get_version()
+        objects = {obj.pk: obj for obj in self.get_model().objects.all()}
+        # `objects` goes last: `is_stale()` reads the rest once it's set.
+        self.checked_at = monotonic()
+        self.version = version
+        self.objects = objects
+
+    def all(self, check=False):
+        if self.is_stale(check=check):
+            self.load()
+        return self.objects
+
+    def get(self, pk):
+        objects = self.get_many([pk])
+        return objects[0] if objects else None
+
+    def get_many(self, pks):
+        """
+        Returns the objects for `pks` in order, skipping ids that don't exist.
+        Unknown ids only check the shared version, which every write bumps, so
+        requests for made up ids never reload the table.
+        """
+        objects = self.all()
+        if not objects.keys() >= set(pks):
+            objects = self.all(check=True)
+        return [objects[pk] for pk in pks if pk in objects]
+
+    def bump_version(self):
+        bump_version(self.version_key)
+
+    def invalidate(self, **kwargs):
+        # Other processes only reload once the write is visible to them.
+        self.objects = None
+        transaction.on_commit(self.bump_version)
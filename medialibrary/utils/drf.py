@@ -1,11 +1,133 @@
 from collections import OrderedDict
+from functools import partial
 
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework import serializers
 
+import medialibrary.utils.cache as utils_cache
+
+READABLE_PKRF_VERSION_KEY = "readable_pkrf:version"
+
+
+def parse_list_param(request, name):
+    if request is None or name not in request.query_params:
+        return None
+
+    value = request.query_params.get(name, "")
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+def get_sparse_fieldsets(request):
+    """
+    Returns the sets requested with `?fields=` and `?expand=`, `None` for
+    parameters that were not passed.
+    """
+    return parse_list_param(request, "fields"), parse_list_param(request, "expand")
+
+
+def invalidate_representations(**kwargs):
+    """
+    Drops the representations `ReadablePKRF` shares across requests, on
+    commit. For writes that change them without touching the related row's
+    `updated_at`: `genre_ids` updates, genre and photo changes.
+    """
+    transaction.on_commit(partial(utils_cache.bump_version, READABLE_PKRF_VERSION_KEY))
+
+
+class IdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+    def validate_ids(self, value):
+        limit = self.context.get("limit")
+        if limit is not None and len(value) > limit:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {limit} elements."
+            )
+        return list(dict.fromkeys(value))
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin for sparse fieldsets.
+
+    `?fields=` limits the top level fields. Once either `?fields=` or `?expand=`
+    is passed, the relations listed in `Meta.expandable_fields` are rendered as
+    primary keys unless they are named in `?expand=`. Without both parameters
+    the full representation is returned.
+    """
+
+    def is_root_serializer(self):
+        if self.parent is None:
+            return True
+        return (
+            isinstance(self.parent, serializers.ListSerializer)
+            and self.parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_root_serializer():
+            return fields
+
+        requested, expand = get_sparse_fieldsets(self.context.get("request"))
+        if requested is None and expand is None:
+            return fields
+
+        if requested is not None:
+            for name in set(fields) - requested:
+                fields.pop(name)
+
+        expand = expand or set()
+        for name in getattr(self.Meta, "expandable_fields", ()):
+            if name in fields and name not in expand:
+                fields[name] = self.collapse_field(fields[name])
+        return fields
+
+    def collapse_field(self, field):
+        if isinstance(field, CachedListField):
+            return serializers.ListField(
+                source=field.source, child=serializers.IntegerField(), read_only=True
+            )
+
+        if isinstance(field, serializers.ListSerializer):
+            # The same list class, so the items it reads and limits are kept.
+            return type(field)(
+                child=serializers.PrimaryKeyRelatedField(read_only=True),
+                source=field.source,
+                read_only=True,
+            )
+
+        many = isinstance(field, serializers.ManyRelatedField)
+        return serializers.PrimaryKeyRelatedField(
+            source=field.source, many=many, read_only=True
+        )
+
 
 class ReadablePKRF(serializers.PrimaryKeyRelatedField):
-    def __init__(self, read_serializer, **kwargs):
+    """
+    Accepts a primary key on write and renders the related object with
+    `read_serializer`, or with `list_serializer` inside list responses.
+
+    Representations are memoized per (serializer, pk, updated_at) for the
+    lifetime of the root serializer. When `cache_timeout` is set, those of
+    `list_serializer` are also shared across requests through the cache,
+    keyed by the version `invalidate_representations()` bumps as well. Full
+    representations aren't, as they include relations that change without
+    touching the row.
+    """
+
+    choices_limit = 100
+
+    def __init__(
+        self, read_serializer, list_serializer=None, cache_timeout=None, **kwargs
+    ):
         self.read_serializer = read_serializer
+        self.list_serializer = list_serializer
+        self.cache_timeout = cache_timeout
+        kwargs.setdefault("html_cutoff", self.choices_limit)
         super().__init__(**kwargs)
 
     def get_queryset(self, *args, **kwargs):
@@ -13,17 +135,103 @@ class ReadablePKRF(serializers.PrimaryKeyRelatedField):
         return model.objects.all()
 
     def get_choices(self, cutoff=None):
+        # Choices are only rendered by the browsable API, so they are capped to
+        # the first `choices_limit` rows by primary key instead of reading the
+        # whole table. Validation looks up the submitted pk only.
         queryset = self.get_queryset()
         if queryset is None:
             return {}
 
+        limit = self.choices_limit
         if cutoff is not None:
-            queryset = queryset[:cutoff]
+            limit = min(cutoff, limit)
 
+        queryset = queryset.order_by("pk")[:limit]
         return OrderedDict([(item.pk, self.display_value(item)) for item in queryset])
 
     def use_pk_only_optimization(self):
         return False
 
+    def get_read_serializer(self):
+        if self.list_serializer is not None and isinstance(
+            self.root, serializers.ListSerializer
+        ):
+            return self.list_serializer
+        return self.read_serializer
+
+    def get_cache_version(self):
+        # Read once per root serializer, not once per object.
+        if "readable_pkrf_version" not in self.context:
+            self.context["readable_pkrf_version"] = utils_cache.get_version(
+                READABLE_PKRF_VERSION_KEY
+            )
+        return self.context["readable_pkrf_version"]
+
+    def get_cache_key(self, read_serializer, value):
+        updated_at = getattr(value, "updated_at", None)
+        if updated_at is None:
+            return None
+        return (
+            f"readable_pkrf:{read_serializer.__module__}.{read_serializer.__qualname__}"
+            f":{value.pk}:{updated_at.timestamp()}:{self.get_cache_version()}"
+        )
+
     def to_representation(self, value):
-        return self.read_serializer(value).data
+        read_serializer = self.get_read_serializer()
+        memo = self.context.setdefault("readable_pkrf_memo", {})
+        memo_key = (read_serializer, value.pk, getattr(value, "updated_at", None))
+        if memo_key in memo:
+            return memo[memo_key]
+
+        cache_key = None
+        if self.cache_timeout and read_serializer is self.list_serializer:
+            cache_key = self.get_cache_key(read_serializer, value)
+        data = None
+        if cache_key:
+            data = cache.get(cache_key)
+        if data is None:
+            data = read_serializer(value).data
+            if cache_key:
+                cache.set(cache_key, dict(data), timeout=self.cache_timeout)
+
+        memo[memo_key] = data
+        return data
+
+
+class CachedPKRF(ReadablePKRF):
+    """
+    `ReadablePKRF` for reference tables: the related object is looked up in
+    `reference_cache` by the foreign key value instead of being joined.
+    """
+
+    def __init__(self, read_serializer, reference_cache, **kwargs):
+        self.reference_cache = reference_cache
+        super().__init__(read_serializer, **kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_representation(self, value):
+        obj = self.reference_cache.get(value.pk)
+        if obj is None:
+            return None
+        return super().to_representation(obj)
+
+
+class CachedListField(serializers.ListField):
+    """
+    Renders an array of ids, such as a denormalized id column, as objects from
+    `reference_cache` with `read_serializer`.
+    """
+
+    def __init__(self, read_serializer, reference_cache, **kwargs):
+        self.reference_cache = reference_cache
+        kwargs["child"] = read_serializer()
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, data):
+        return [
+            self.child.to_representation(obj)
+            for obj in self.reference_cache.get_many(data)
+        ]
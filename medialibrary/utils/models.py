@@ -7,3 +7,36 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class FileTrackingMixin:
+    """
+    Remembers the names of `tracked_file_fields` as loaded from the database,
+    so a save can tell a replaced file from a metadata-only edit.
+    """
+
+    tracked_file_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_files = {
+            name: instance.__dict__.get(name) for name in cls.tracked_file_fields
+        }
+        return instance
+
+    def has_file_changed(self, name):
+        if self._state.adding:
+            return True
+        # A deferred file can't have been reassigned.
+        if name in self.get_deferred_fields():
+            return False
+        file = getattr(self, name)
+        loaded = getattr(self, "_loaded_files", {}).get(name)
+        return not file._committed or file.name != loaded
+
+    def mark_file_saved(self, name):
+        self._loaded_files = {
+            **getattr(self, "_loaded_files", {}),
+            name: getattr(self, name).name,
+        }
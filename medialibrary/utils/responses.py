@@ -0,0 +1,110 @@
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """
+    Returns the `(start, end)` byte positions, end inclusive, requested by a
+    `Range` header for a file of `size` bytes. None means the whole file is
+    served, either because no single range is requested or because it's
+    malformed. Raises ValueError if the range can't be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # A suffix range, the last `end` bytes.
+        length = int(end)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+class RangeFile:
+    """
+    Reads at most `length` bytes of an open file from its current position.
+    The file descriptor stays available, so WSGI servers with `sendfile`
+    support (gunicorn) send the range from the kernel without copying it.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+        self.name = file.name
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def if_range_matches(request, etag, last_modified):
+    header = request.headers.get("If-Range")
+    if header is None:
+        return True
+    if header.startswith('"'):
+        return header == etag
+    # Dates only validate an exact, strong match.
+    return parse_http_date_safe(header) == last_modified
+
+
+def ranged_file_response(request, path, size, etag, last_modified):
+    """
+    Returns a `FileResponse` for the file at `path` honouring `Range`,
+    `If-Range` and the other conditional request headers, so clients seeking
+    in a video only receive the bytes they ask for.
+    """
+    etag = quote_etag(etag)
+    last_modified = int(last_modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    byte_range = None
+    header = request.headers.get("Range")
+    if header and if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(file)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(RangeFile(file, end - start + 1), status=206)
+        response.headers["Content-Length"] = str(end - start + 1)
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response.headers["Accept-Ranges"] = "bytes"
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    return response
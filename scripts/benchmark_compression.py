@@ -0,0 +1,72 @@
+import gzip
+import os
+import sys
+from itertools import cycle, islice
+from statistics import median
+from time import perf_counter
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+from rest_framework.test import APIRequestFactory
+
+import medialibrary.catalog.views as catalog_v
+from medialibrary.utils.middleware import brotli
+from medialibrary.utils.renderers import FastJSONRenderer
+
+PAGE_SIZE = 200
+RUNS = 20
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def get_movie_page_content():
+    expandable_fields = catalog_v.MovieVS.serializer_class.Meta.expandable_fields
+    request = APIRequestFactory().get(
+        "/", {"page_size": PAGE_SIZE, "expand": ",".join(expandable_fields)}
+    )
+    response = catalog_v.MovieVS.as_view({"get": "list"})(request)
+    results = response.data["results"]
+    response.data["results"] = list(islice(cycle(results), PAGE_SIZE))
+    return FastJSONRenderer().render(response.data)
+
+
+def measure(name, compress, content):
+    timings = []
+    for _ in range(RUNS):
+        start = perf_counter()
+        compressed = compress(content)
+        timings.append(perf_counter() - start)
+    ratio = len(compressed) / len(content) * 100
+    print(
+        f"  {name:<12}{len(compressed):>10} bytes{ratio:>7.1f} %"
+        f"{median(timings) * 1000:>10.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    content = get_movie_page_content()
+    print(f"Movie list page of {PAGE_SIZE} items: {len(content)} bytes uncompressed")
+    print(f"Median of {RUNS} runs")
+
+    for level in GZIP_LEVELS:
+        measure(
+            f"gzip -{level}",
+            lambda data: gzip.compress(data, compresslevel=level, mtime=0),
+            content,
+        )
+
+    if brotli is None:
+        print("  brotli is not installed")
+    else:
+        for quality in BROTLI_QUALITIES:
+            measure(
+                f"br q{quality}",
+                lambda data: brotli.compress(
+                    data, quality=quality, mode=brotli.MODE_TEXT
+                ),
+                content,
+            )
@@ -0,0 +1,70 @@
+import os
+import sys
+from statistics import median
+from time import perf_counter
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_filters import rest_framework as filters
+
+import medialibrary.catalog.filters as catalog_f
+import medialibrary.catalog.models as catalog_m
+
+RUNS = 20
+PAGE_SIZE = 20
+
+
+class ConjoinedMovieFilter(filters.FilterSet):
+    # The previous implementation: one join per selected genre.
+    genres = filters.ModelMultipleChoiceFilter(
+        field_name="genres",
+        queryset=catalog_m.MediaGenre.objects.all(),
+        conjoined=True,
+    )
+
+    class Meta:
+        model = catalog_m.Movie
+        fields = ()
+
+
+class MovieFilter(catalog_f.MovieFilter):
+    class Meta(catalog_f.MovieFilter.Meta):
+        fields = ()
+
+
+def measure(filterset_class, genre_ids):
+    timings = []
+    for _ in range(RUNS):
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            qs = filterset_class(
+                {"genres": genre_ids}, queryset=catalog_m.Movie.objects.all()
+            ).qs
+            count = qs.count()
+            list(qs.order_by("pk").values_list("pk", flat=True)[:PAGE_SIZE])
+            timings.append(perf_counter() - start)
+    return count, median(timings) * 1000, len(queries)
+
+
+if __name__ == "__main__":
+    genre_ids = list(
+        catalog_m.MediaGenre.objects.order_by("pk").values_list("pk", flat=True)[:5]
+    )
+    print(
+        f"Filtering {catalog_m.Movie.objects.count()} movies by genres, "
+        f"median of {RUNS} runs"
+    )
+    for k in range(1, len(genre_ids) + 1):
+        print(f"{k} genres")
+        for name, filterset_class in (
+            ("conjoined", ConjoinedMovieFilter),
+            ("contains", MovieFilter),
+        ):
+            count, ms, queries = measure(filterset_class, genre_ids[:k])
+            print(f"  {name:<10}{count:>8} items{ms:>10.2f} ms{queries:>4} queries")
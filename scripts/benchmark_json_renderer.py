@@ -0,0 +1,61 @@
+import os
+import sys
+from io import BytesIO
+from itertools import cycle, islice
+from statistics import median
+from time import perf_counter
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+import medialibrary.catalog.views as catalog_v
+from medialibrary.utils.parsers import FastJSONParser
+from medialibrary.utils.renderers import FastJSONRenderer
+
+PAGE_SIZE = 200
+RUNS = 20
+
+
+def get_movie_page():
+    # Full movie representations, repeated up to PAGE_SIZE items when the
+    # local catalog is smaller than a page.
+    expandable_fields = catalog_v.MovieVS.serializer_class.Meta.expandable_fields
+    request = APIRequestFactory().get(
+        "/", {"page_size": PAGE_SIZE, "expand": ",".join(expandable_fields)}
+    )
+    response = catalog_v.MovieVS.as_view({"get": "list"})(request)
+    results = response.data["results"]
+    response.data["results"] = list(islice(cycle(results), PAGE_SIZE))
+    return response.data
+
+
+def timeit(func):
+    timings = []
+    for _ in range(RUNS):
+        start = perf_counter()
+        result = func()
+        timings.append(perf_counter() - start)
+    return result, median(timings) * 1000
+
+
+if __name__ == "__main__":
+    data = get_movie_page()
+    print(f"Movie list page of {PAGE_SIZE} items, median of {RUNS} runs")
+
+    for renderer, parser in (
+        (JSONRenderer(), JSONParser()),
+        (FastJSONRenderer(), FastJSONParser()),
+    ):
+        content, render_ms = timeit(lambda: renderer.render(data))
+        _, parse_ms = timeit(lambda: parser.parse(BytesIO(content)))
+        print(
+            f"  {renderer.__class__.__name__:<18}{len(content):>10} bytes"
+            f"{render_ms:>10.2f} ms render{parse_ms:>10.2f} ms parse"
+        )
@@ -0,0 +1,51 @@
+import os
+import sys
+from statistics import median
+from time import perf_counter
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+import medialibrary.catalog.views as catalog_v
+
+PAGE_SIZE = 200
+RUNS = 10
+
+
+def measure(viewset, params):
+    view = viewset.as_view({"get": "list"})
+    factory = APIRequestFactory()
+    timings = []
+    for _ in range(RUNS):
+        request = factory.get("/", params)
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            response = view(request)
+            response.render()
+            timings.append(perf_counter() - start)
+    return len(response.content), median(timings) * 1000, len(queries)
+
+
+def compare(viewset):
+    expandable_fields = viewset.serializer_class.Meta.expandable_fields
+    detail = measure(
+        viewset, {"page_size": PAGE_SIZE, "expand": ",".join(expandable_fields)}
+    )
+    compact = measure(viewset, {"page_size": PAGE_SIZE})
+
+    print(viewset.__name__)
+    for name, (size, ms, queries) in (("detail", detail), ("list", compact)):
+        print(f"  {name:<8}{size:>10} bytes{ms:>10.1f} ms{queries:>4} queries")
+
+
+if __name__ == "__main__":
+    print(f"Serializing a page of {PAGE_SIZE} items, median of {RUNS} runs")
+    for viewset in (catalog_v.MovieVS, catalog_v.SeriesVS, catalog_v.GameVS):
+        compare(viewset)
@@ -0,0 +1,55 @@
+import os
+import sys
+from io import BytesIO
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+import medialibrary.common.constants as common_c
+import medialibrary.common.models as common_m
+from medialibrary.utils.base_views import DynamicResultsSetPagination
+
+PAGE_SIZE = DynamicResultsSetPagination.page_size
+# A poster as uploaded, 2000x3000 at high JPEG quality.
+POSTER_SIZE = (2000, 3000)
+
+
+def create_poster():
+    # Fractal detail with a little grain, to compress roughly like a photo.
+    fractal = Image.effect_mandelbrot(POSTER_SIZE, (-2.0, -1.5, 1.0, 1.5), 100)
+    gradient = Image.linear_gradient("L").resize(POSTER_SIZE)
+    grain = Image.blend(gradient, Image.effect_noise(POSTER_SIZE, 64), 0.1)
+    image = Image.merge("RGB", (fractal, gradient, grain))
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=95)
+    return default_storage.save(
+        "photos/benchmark/poster.jpg", ContentFile(buffer.getvalue())
+    )
+
+
+if __name__ == "__main__":
+    photo = common_m.Photo(photo=create_poster(), type=common_c.PHOTO_TYPE_POSTER)
+    try:
+        photo.variants = photo.build_variants()
+        print(f"Posters on a list page of {PAGE_SIZE} items")
+
+        original = default_storage.size(photo.photo.name)
+        print(f"  {'original':<14}{original * PAGE_SIZE / 1024:>10.0f} KB")
+        for variant, data in photo.variants.items():
+            for ext, name in data["files"].items():
+                size = default_storage.size(name)
+                label = f"{variant} {ext}"
+                print(
+                    f"  {label:<14}{size * PAGE_SIZE / 1024:>10.0f} KB"
+                    f"{original / size:>10.1f}x smaller"
+                )
+    finally:
+        for name in [photo.photo.name, *photo.get_variant_names()]:
+            default_storage.delete(name)
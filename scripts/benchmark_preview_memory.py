@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+import tracemalloc
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from moviepy.config import get_setting
+from moviepy.editor import VideoFileClip
+
+import medialibrary.common.models as common_m
+
+# Length of the synthetic video, about 5 MB per second at the given bitrate.
+DURATION = int(os.environ.get("BENCHMARK_PREVIEW_DURATION", 120))
+BITRATE = "40M"
+
+
+def create_video(path):
+    subprocess.run(
+        [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size=1920x1080:rate=30:duration={DURATION}",
+            "-c:v",
+            "mpeg4",
+            "-b:v",
+            BITRATE,
+            path,
+        ],
+        check=True,
+    )
+
+
+def read_whole(video, path):
+    # The former implementation, for comparison.
+    with NamedTemporaryFile() as f:
+        f.write(video.video.file.read())
+        f.flush()
+    video.video.close()
+
+
+def copy_chunks(video, path):
+    with NamedTemporaryFile() as f:
+        video.copy_video(f)
+
+
+def save_frame(video, path):
+    with NamedTemporaryFile(suffix=".jpg") as f:
+        clip = VideoFileClip(path, audio=False)
+        clip.save_frame(f.name, t=min(1, clip.duration))
+        clip.close()
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = perf_counter()
+    func(*args)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed * 1000
+
+
+if __name__ == "__main__":
+    with NamedTemporaryFile(suffix=".mp4") as source:
+        create_video(source.name)
+        name = default_storage.save("videos/benchmark/video.mp4", File(source))
+
+    try:
+        video = common_m.Video(video=name)
+        path = default_storage.path(name)
+        size = default_storage.size(name) / 1024 / 1024
+        print(f"Synthetic video of {size:.0f} MB, peak Python memory")
+
+        for label, func in (
+            ("read whole", read_whole),
+            ("copy chunks", copy_chunks),
+            ("save frame", save_frame),
+        ):
+            peak, elapsed = measure(func, video, path)
+            print(f"  {label:<14}{peak:>10.1f} MB{elapsed:>12.2f} ms")
+    finally:
+        default_storage.delete(name)
@@ -0,0 +1,45 @@
+import os
+import sys
+from statistics import median
+from time import perf_counter
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory
+
+import medialibrary.catalog.documents as catalog_d
+import medialibrary.catalog.views as catalog_v
+
+PAGE_SIZE = 200
+RUNS = 10
+
+
+def measure(viewset, read_model):
+    view = viewset.as_view({"get": "list"})
+    factory = APIRequestFactory()
+    timings = []
+    with override_settings(CATALOG_READ_MODEL=read_model):
+        for _ in range(RUNS):
+            request = factory.get("/", {"page_size": PAGE_SIZE})
+            with CaptureQueriesContext(connection) as queries:
+                start = perf_counter()
+                response = view(request)
+                response.render()
+                timings.append(perf_counter() - start)
+    return median(timings) * 1000, len(queries)
+
+
+if __name__ == "__main__":
+    print(f"Listing a page of {PAGE_SIZE} items, median of {RUNS} runs")
+    for viewset in (catalog_v.MovieVS, catalog_v.SeriesVS, catalog_v.GameVS):
+        catalog_d.refresh_documents(viewset.queryset.model)
+        print(viewset.__name__)
+        for name, read_model in (("orm", False), ("documents", True)):
+            ms, queries = measure(viewset, read_model)
+            print(f"  {name:<10}{ms:>10.1f} ms{queries:>4} queries")
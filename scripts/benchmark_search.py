@@ -0,0 +1,59 @@
+import os
+import sys
+from statistics import quantiles
+from time import perf_counter
+
+import django
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+django.setup()
+
+import medialibrary.catalog.models as catalog_m
+from medialibrary.catalog.search import search_all
+
+# Set BENCHMARK_SEARCH_FIXTURE to bulk create that many synthetic movies
+# before measuring, e.g. 1000000 for the catalog size the endpoint targets.
+FIXTURE_SIZE = int(os.environ.get("BENCHMARK_SEARCH_FIXTURE", 0))
+BATCH_SIZE = 10000
+RUNS = 200
+QUERIES = ("matrix", "the dark", "star wars", "keanu", "lord of the")
+PREFIX_QUERIES = ("mat", "the da", "sta", "kea", "lord o")
+WORDS = ("dark", "star", "lord", "night", "matrix", "ring", "war", "city", "blue")
+
+
+def create_fixture(size):
+    for start in range(0, size, BATCH_SIZE):
+        catalog_m.Movie.objects.bulk_create(
+            catalog_m.Movie(
+                title=" ".join(
+                    WORDS[(i // len(WORDS) ** power) % len(WORDS)] for power in range(3)
+                )
+                + f" {i}",
+                description="Synthetic benchmark title",
+            )
+            for i in range(start, min(start + BATCH_SIZE, size))
+        )
+
+
+def measure(queries, prefix):
+    timings = []
+    for i in range(RUNS):
+        start = perf_counter()
+        search_all(queries[i % len(queries)], 5, prefix=prefix)
+        timings.append(perf_counter() - start)
+    percentiles = quantiles(timings, n=100)
+    return percentiles[49] * 1000, percentiles[94] * 1000
+
+
+if __name__ == "__main__":
+    if FIXTURE_SIZE:
+        create_fixture(FIXTURE_SIZE)
+
+    print(f"Searching {catalog_m.Movie.objects.count()} movies, {RUNS} runs")
+    for name, queries, prefix in (
+        ("full", QUERIES, False),
+        ("prefix", PREFIX_QUERIES, True),
+    ):
+        p50, p95 = measure(queries, prefix)
+        print(f"  {name:<8}{p50:>10.2f} ms p50{p95:>10.2f} ms p95")